@@ -0,0 +1,169 @@
+"""
+ExchangeManager.on_timer_update 벤치마크 (SimulatedOpenApi 사용, 실계좌 불필요)
+
+실행:
+    python -m benchmark.CopyLoopBenchmark run --symbols 1,50,500 --followers 1,10,100 --latencies 0,0.02
+    python -m benchmark.CopyLoopBenchmark compare benchmark/results/old.json benchmark/results/new.json
+
+측정 항목 (시나리오별)
+- tick_wall_ms: tick 한번 소요시간
+- tick_cpu_ms: tick 한번 CPU 시간 (process_time)
+- alloc_kib_per_tick: tick 한번 최대 메모리 할당량 (tracemalloc, 별도 측정)
+- change_to_last_order_ms: master 변경 ~ 마지막 slave 주문 응답
+결과는 JSON 파일로 저장해서 버전끼리 비교
+"""
+from core import logManager
+from core.AccountRegistry import Account, AccountRegistry
+from core.ExchangeManager import ExchangeManager
+from core.RateLimiter import RateLimiter
+from core.types import *
+from simulator import LatencyProfile, SimulatedExchange, SimulatedOpenApi
+from benchmark.common import *
+import asyncio, fire, json, random, sys, time, tracemalloc
+
+
+class CopyLoopScenario:
+    """
+    master 1개 + follower N개, 종목 S개
+    change_every tick마다 master 종목의 change_ratio 만큼 포지션 변경
+    """
+    def __init__(self, symbols: int, followers: int, latency: float, change_ratio: float = 0.1, seed: int = 0):
+        self.symbols = symbols
+        self.followers = followers
+        self.latency = latency
+        self.change_ratio = change_ratio
+        self.rng = random.Random(seed)
+        self.codes = [f"S{i:03d}M26" for i in range(symbols)]
+
+        self.exchange = SimulatedExchange(seed=seed)
+        if latency > 0:
+            for tr_cd in ("CIDBQ01500", "CIDBQ01800", "CIDBT00100", "CIDBT01000"):
+                self.exchange.set_latency(tr_cd, LatencyProfile(median=latency, sigma=0.3))
+
+        registry = AccountRegistry()
+        registry.api_factory = lambda: SimulatedOpenApi(self.exchange)
+        registry.master = Account("MASTER", APIType.MASTER, app_key="master", secret_key="secret", api=SimulatedOpenApi(self.exchange))
+        registry.slaves = [
+            Account(f"SLAVE{i + 1}", APIType.SLAVE, app_key=f"slave{i + 1}", secret_key="secret", api=SimulatedOpenApi(self.exchange))
+            for i in range(followers)
+        ]
+        self.manager = ExchangeManager()
+        self.manager.accounts = registry
+        self.manager.double_check_delay = float("inf")  # 벤치마크 tick 사이에는 double check 하지 않음
+        self.manager.rate_limiter = RateLimiter({})         # tick을 연달아 실행하므로 LS 요청 제한 없이 처리 비용만 측정
+
+    async def setup(self) -> None:
+        await self.manager.initialize()
+        for code in self.codes:
+            self.exchange.set_position("master", code, self.rng.choice((-3, -2, -1, 1, 2, 3)))
+
+    def change_master(self) -> None:
+        count = max(1, int(self.symbols * self.change_ratio))
+        master = self.exchange.get_account("master")
+        for code in self.rng.sample(self.codes, count):
+            self.exchange.set_position("master", code, master.positions.get(code, 0) + self.rng.choice((-2, -1, 1, 2)))
+
+    async def tick(self) -> None:
+        self.manager.poll_scheduler.deadlines.clear()  # 매 tick 모든 계좌 조회
+        await self.manager.on_timer_update()
+        # slave 잔고 조회는 백그라운드 -> 끝날 때까지 포함해서 측정 (다음 tick에서 건너뛰지 않도록)
+        await asyncio.gather(*self.manager.reconcile_tasks.values())
+
+    async def run(self, ticks: int, change_every: int) -> dict:
+        await self.setup()
+        await self.tick()  # 초기 카피 (측정 제외)
+
+        wall, cpu, change_latency = [], [], []
+        for i in range(ticks):
+            changed = i % change_every == 0
+            if changed:
+                self.change_master()
+            change_start = time.perf_counter()
+            cpu_start = time.process_time()
+            await self.tick()
+            cpu.append((time.process_time() - cpu_start) * 1000)
+            wall.append((time.perf_counter() - change_start) * 1000)
+            results = self.manager.order_dispatcher.last_results
+            if changed and results:
+                change_latency.append((max(r.accepted_at for r in results) - change_start) * 1000)
+                self.manager.order_dispatcher.last_results = []
+
+        # 메모리 할당 (tracemalloc은 느리므로 따로 몇 tick만)
+        alloc = []
+        tracemalloc.start()
+        for i in range(min(ticks, 5)):
+            if i % change_every == 0:
+                self.change_master()
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            await self.tick()
+            _, peak = tracemalloc.get_traced_memory()
+            alloc.append((peak - start) / 1024)
+        tracemalloc.stop()
+
+        return {
+            "symbols": self.symbols,
+            "followers": self.followers,
+            "latency": self.latency,
+            "change_ratio": self.change_ratio,
+            "ticks": ticks,
+            "change_every": change_every,
+            "orders": self.exchange.request_counts.get("CIDBT00100", 0),
+            "tick_wall_ms": summarize(wall),
+            "tick_cpu_ms": summarize(cpu),
+            "alloc_kib_per_tick": summarize(alloc),
+            "change_to_last_order_ms": summarize(change_latency),
+        }
+
+
+async def run_all(symbols: list, followers: list, latencies: list, ticks: int, change_every: int, change_ratio: float, seed: int) -> list[dict]:
+    results = []
+    for s in symbols:
+        for f in followers:
+            for latency in latencies:
+                scenario = CopyLoopScenario(int(s), int(f), float(latency), change_ratio, seed)
+                result = await scenario.run(ticks, change_every)
+                results.append(result)
+                print(
+                    f"symbols={s:>4} followers={f:>4} latency={latency:<5} | "
+                    f"tick p50 {result['tick_wall_ms']['p50']:8.2f} ms | "
+                    f"cpu p50 {result['tick_cpu_ms']['p50']:8.2f} ms | "
+                    f"alloc {result['alloc_kib_per_tick']['max']:9.1f} KiB | "
+                    f"change->last order p90 {result['change_to_last_order_ms']['p90']:8.2f} ms",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def run(symbols="1,50,500", followers="1,10,100", latencies="0,0.02", ticks=20, change_every=2, change_ratio=0.1, seed=0, output=None):
+    """
+    시나리오 전체 실행 후 JSON 저장
+    """
+    logManager.set_console_log_level("ERROR")
+    results = asyncio.run(run_all(as_list(symbols), as_list(followers), as_list(latencies), ticks, change_every, change_ratio, seed))
+    output = write_report("copy_loop", results, output)
+    print(output)
+
+
+def compare(old: str, new: str, metric="tick_wall_ms", stat="p50"):
+    """
+    두 결과 파일의 같은 시나리오끼리 비교 (new / old 비율)
+    """
+    with open(old) as f:
+        old_report = json.load(f)
+    with open(new) as f:
+        new_report = json.load(f)
+    key = lambda r: (r["symbols"], r["followers"], r["latency"], r["change_ratio"])
+    old_results = {key(r): r for r in old_report["scenarios"]}
+    print(f"{metric}.{stat}: {old_report['version']} -> {new_report['version']}")
+    for result in new_report["scenarios"]:
+        before = old_results.get(key(result))
+        if before is None:
+            continue
+        a, b = before[metric][stat], result[metric][stat]
+        ratio = b / a if a else float("inf")
+        print(f"symbols={result['symbols']:>4} followers={result['followers']:>4} latency={result['latency']:<5} | {a:10.2f} -> {b:10.2f} ({ratio:5.2f}x)")
+
+
+if __name__ == "__main__":
+    fire.Fire({"run": run, "compare": compare})
@@ -0,0 +1,105 @@
+"""
+로그 호출 오버헤드 벤치마크 (event loop thread에서 호출하는 쪽 시간만 측정)
+
+실행:
+    python -m benchmark.LoggingBenchmark run --calls 20000 --per_tick 20
+
+측정 항목 (sink 설정별)
+- filtered_ns: 레벨이 낮아서 버려지는 logManager.trace / debug 호출 한번
+- decorated_ns: log_level_under로 건너뛰는 log_trace_message 호출 한번
+- file_us: 파일에 기록되는 logManager.info 호출 한번
+- tick_us: tick_context 안에서 per_tick 번 로그 (trace, debug 섞어서 info 1/4) 한 tick
+- drain_ms: 마지막 호출 ~ 대기열의 로그가 모두 파일에 기록될 때까지 (queued만)
+"""
+from core import logManager
+from benchmark.common import *
+from loguru import logger
+import asyncio, fire, os, sys, tempfile, time
+
+SINKS = {
+    "text_sync": {"json_logs": False, "queued": False},
+    "text_queued": {"json_logs": False, "queued": True},
+    "json_queued": {"json_logs": True, "queued": True},
+}
+
+
+def time_calls(func, calls: int) -> float:
+    """
+    returns: 호출 한번 평균 (초)
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+async def complete() -> None:
+    await logger.complete()
+
+
+def run_tick(per_tick: int) -> None:
+    with logManager.tick_context():
+        for i in range(per_tick):
+            if i % 4 == 0:
+                logManager.info(f"tick message {i}")
+            elif i % 2:
+                logManager.debug(f"tick message {i}")
+            else:
+                logManager.trace(f"tick message {i}")
+
+
+def run_sink(name: str, json_logs: bool, queued: bool, calls: int, per_tick: int, ticks: int, directory: str) -> dict:
+    handler_id = logManager.add_file_sink(os.path.join(directory, f"{name}.log"), json_logs, queued)
+    try:
+        filtered = time_calls(lambda: logManager.debug("filtered"), calls)
+        decorated = time_calls(lambda: logManager.log_trace_message("filtered"), calls)
+        file = time_calls(lambda: logManager.info("benchmark message"), calls)
+        tick_values = []
+        for _ in range(ticks):
+            start = time.perf_counter()
+            run_tick(per_tick)
+            tick_values.append((time.perf_counter() - start) * 1e6)
+        start = time.perf_counter()
+        asyncio.run(complete())
+        drain = time.perf_counter() - start
+    finally:
+        logger.remove(handler_id)
+    return {
+        "sink": name,
+        "json_logs": json_logs,
+        "queued": queued,
+        "per_tick": per_tick,
+        "filtered_ns": filtered * 1e9,
+        "decorated_ns": decorated * 1e9,
+        "file_us": file * 1e6,
+        "tick_us": summarize(tick_values),
+        "drain_ms": drain * 1e3 if queued else 0.0,
+    }
+
+
+def run(calls=20000, per_tick=20, ticks=500, sinks="text_sync,text_queued,json_queued", output=None):
+    """
+    sink 설정별로 실행 후 JSON 저장
+    """
+    logManager.set_console_log_level("ERROR")
+    logger.remove(logManager.file_handler_id)  # log/ 대신 임시 디렉토리에 기록
+    names = sinks.split(",") if isinstance(sinks, str) else list(sinks)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names:
+            result = run_sink(name, **SINKS[name], calls=calls, per_tick=per_tick, ticks=ticks, directory=directory)
+            results.append(result)
+            print(
+                f"{name:<13} | filtered {result['filtered_ns']:7.1f} ns | "
+                f"decorated {result['decorated_ns']:7.1f} ns | "
+                f"file {result['file_us']:7.2f} us | "
+                f"tick p50 {result['tick_us']['p50']:8.2f} us p99 {result['tick_us']['p99']:8.2f} us | "
+                f"drain {result['drain_ms']:7.1f} ms",
+                file=sys.stderr,
+            )
+    output = write_report("logging", results, output)
+    print(output)
+
+
+if __name__ == "__main__":
+    fire.Fire({"run": run})
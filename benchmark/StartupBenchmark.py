@@ -0,0 +1,86 @@
+"""
+프로세스 시작 ~ 첫 tick 완료까지 시간 벤치마크 (SimulatedOpenApi 사용, 실계좌 불필요)
+
+실행:
+    python -m benchmark.StartupBenchmark run --followers 2 --login_latency 0.3 --repeat 5
+
+측정 항목 (ms, 매번 새 프로세스로 실행)
+- interpreter: 프로세스 생성 ~ 스크립트 첫 줄
+- imports: main 모듈 import
+- startup: lifespan startup (로그인, 상태 복원)
+- first_tick: startup 완료 ~ 첫 on_timer_update 완료
+- total: 프로세스 생성 ~ 첫 tick 완료
+"""
+from benchmark.common import *
+import fire, json, os, subprocess, sys, time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행할 코드 (설정은 .env 대신 직접 지정)
+CHILD_CODE = """
+import time
+t_begin = time.time()
+import asyncio, json, os, tempfile
+from settings import settings
+settings.USE_SIMULATOR = True
+settings.DISCORD_WEBHOOK_URL = ""
+settings.WHITELIST = settings.WHITELIST or []
+settings.MASTER_APP_KEY = settings.MASTER_SECRET_KEY = "master"
+settings.SLAVE1_APP_KEY = settings.SLAVE2_APP_KEY = None
+settings.SLAVE_ACCOUNTS = [{{"name": f"SLAVE{{i + 1}}", "app_key": f"slave{{i + 1}}", "secret_key": "secret"}} for i in range({followers})]
+import main
+t_import = time.time()
+
+from core import core, logManager, metrics
+from core.StateStore import StateStore
+from core.LeaderElection import LeaderElection
+from simulator import LatencyProfile, simulatedExchange
+logManager.set_console_log_level("ERROR")
+simulatedExchange.set_latency("login", LatencyProfile(median={login_latency}))
+simulatedExchange.set_latency("CIDBQ01500", LatencyProfile(median={tr_latency}))
+core.state_store = StateStore(os.path.join(tempfile.mkdtemp(), "state.db"))
+core.leader_election = LeaderElection(core.state_store.path)
+
+async def run():
+    async with main.lifespan(main.app):
+        t_ready = time.time()
+        while not metrics.tick_seconds.series:
+            await asyncio.sleep(0.001)
+        t_tick = time.time()
+    print(json.dumps({{"t_begin": t_begin, "t_import": t_import, "t_ready": t_ready, "t_tick": t_tick}}))
+
+asyncio.run(run())
+"""
+
+
+def run_once(followers: int, login_latency: float, tr_latency: float) -> dict:
+    code = CHILD_CODE.format(followers=followers, login_latency=login_latency, tr_latency=tr_latency)
+    t_spawn = time.time()
+    completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, timeout=120)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(f"startup benchmark child failed:\n{completed.stderr[-2000:]}")
+    t = json.loads(lines[-1])
+    return {
+        "interpreter": (t["t_begin"] - t_spawn) * 1000,
+        "imports": (t["t_import"] - t["t_begin"]) * 1000,
+        "startup": (t["t_ready"] - t["t_import"]) * 1000,
+        "first_tick": (t["t_tick"] - t["t_ready"]) * 1000,
+        "total": (t["t_tick"] - t_spawn) * 1000,
+    }
+
+
+def run(followers=2, login_latency=0.3, tr_latency=0.05, repeat=5, output=None):
+    """
+    repeat 번 새 프로세스로 시작해서 구간별 시간 JSON 저장
+    """
+    samples = [run_once(int(followers), float(login_latency), float(tr_latency)) for _ in range(repeat)]
+    phases = {name: summarize([sample[name] for sample in samples]) for name in samples[0]}
+    for name, summary in phases.items():
+        print(f"{name:<12} p50 {summary['p50']:8.1f} ms | max {summary['max']:8.1f} ms", file=sys.stderr)
+    result = {"followers": followers, "login_latency": login_latency, "tr_latency": tr_latency, "repeat": repeat, **phases}
+    print(write_report("startup", [result], output))
+
+
+if __name__ == "__main__":
+    fire.Fire({"run": run})
@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from settings import settings
+from typing import Callable
+from .types import *
+from .OrderLedger import OrderLedger
+from .PositionBook import PositionBook
+import asyncio, ebest, math
+
+
+@dataclass
+class Account:
+    """
+    계좌 하나의 API 인스턴스, 연결상태, 포지션
+    """
+    name: str
+    type: APIType
+    app_key: str = ""
+    secret_key: str = ""
+    multiple: int = 1  # 설정파일의 기본 배수 (betting params에 값이 있으면 그 값을 사용)
+    poll_interval: float | None = None  # 잔고 조회 주기 (None이면 설정파일 기본값)
+    api: ebest.OpenApi = field(default_factory=ebest.OpenApi, repr=False)
+    connected: bool = False
+    last_message: str = ""  # 마지막 TR 요청의 에러 메세지
+    last_transient: bool = False  # 마지막 TR 요청 실패가 일시적 에러인지 (SERVICE_DELAY, 연결 끊김 등)
+
+    # session
+    session_generation: int = 0           # 로그인(토큰 발급)할 때마다 +1
+    token_expires_at: float = math.inf    # 토큰 만료 예정 시각 (time.monotonic)
+    refresh_at: float = math.inf          # 백그라운드 재발급 예정 시각 (time.monotonic)
+    session_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    # positions
+    positions: PositionBook = field(default_factory=PositionBook)  # {종목코드: net 수량}
+    version: int = 0                      # 포지션이 바뀔 때마다 +1
+    synced_version: int = 0               # 마지막으로 처리한 version
+    changed_at: float = 0.0               # 마지막으로 포지션이 바뀐 시각 (time.perf_counter)
+    ledger: OrderLedger = field(default_factory=OrderLedger, repr=False)  # 잔고에서 확인 전인 주문
+
+
+class AccountRegistry:
+    """
+    master 1개와 slave N개 계좌 목록
+    slave 목록은 SLAVE_ACCOUNTS 설정 + 기존 SLAVE1/SLAVE2 키 설정에서 로드
+    """
+    def __init__(self):
+        self.master: Account = Account("MASTER", APIType.MASTER)
+        self.slaves: list[Account] = []
+        self.api_factory: Callable[[], ebest.OpenApi] | None = None  # 지정하면 create_api 대신 사용 (simulator)
+        self.load()
+
+    def create_api(self) -> ebest.OpenApi:
+        if self.api_factory is not None:
+            return self.api_factory()
+        if settings.USE_SIMULATOR:
+            from simulator import SimulatedOpenApi, simulatedExchange
+            return SimulatedOpenApi(simulatedExchange)
+        return ebest.OpenApi()
+
+    def load(self) -> None:
+        self.master = Account(
+            name="MASTER",
+            type=APIType.MASTER,
+            app_key=settings.MASTER_APP_KEY or "",
+            secret_key=settings.MASTER_SECRET_KEY or "",
+            api=self.create_api(),
+        )
+        self.slaves = []
+
+        # 기존 SLAVE1, SLAVE2 설정
+        for name, app_key, secret_key in (
+            ("SLAVE1", settings.SLAVE1_APP_KEY, settings.SLAVE1_SECRET_KEY),
+            ("SLAVE2", settings.SLAVE2_APP_KEY, settings.SLAVE2_SECRET_KEY),
+        ):
+            if app_key and secret_key:
+                self.add_slave(Account(name=name, type=APIType.SLAVE, app_key=app_key, secret_key=secret_key, api=self.create_api()))
+
+        # SLAVE_ACCOUNTS 설정
+        for config in settings.SLAVE_ACCOUNTS or []:
+            name = str(config.get("name") or f"SLAVE{len(self.slaves) + 1}")
+            self.add_slave(Account(
+                name=name,
+                type=APIType.SLAVE,
+                app_key=config.get("app_key", ""),
+                secret_key=config.get("secret_key", ""),
+                multiple=int(config.get("multiple", 1)),
+                poll_interval=float(config["poll_interval"]) if config.get("poll_interval") else None,
+                api=self.create_api(),
+            ))
+
+    def add_slave(self, account: Account) -> None:
+        if self.get(account.name) is not None:
+            raise ValueError(f"중복된 계좌 이름입니다: {account.name}")
+        self.slaves.append(account)
+
+    def get(self, name: str) -> Account | None:
+        for account in self.accounts:
+            if account.name == name:
+                return account
+        return None
+
+    @property
+    def accounts(self) -> list[Account]:
+        """master가 항상 첫번째"""
+        return [self.master] + self.slaves
+
+
+# singleton instance
+accountRegistry = AccountRegistry()
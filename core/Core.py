@@ -5,6 +5,12 @@ from datetime import datetime, timedelta
 from settings import settings
 from .EmergencyControl import emergencyControl
 from .ExchangeManager import exchangeManager
+from .Metrics import metrics
+from .StatusPublisher import StatusPublisher, StatusSnapshot
+from .EventBroker import eventBroker
+from .StateStore import StateStore
+from .LeaderElection import LeaderElection
+from .PositionBook import PositionBook
 
 
 class Core:
@@ -14,61 +20,176 @@ class Core:
         current_dir = os.path.dirname(os.path.abspath(__file__))
         project_dir = os.path.dirname(current_dir)  # core 폴더의 상위 폴더 (프로젝트 루트)
         self.params_dir = os.path.join(project_dir, "params")
+        self.state_store = StateStore(os.path.join(self.params_dir, "state.db"))
+        self.saved_versions: dict[str, int] = {}  # {계좌 이름: 마지막으로 저장한 포지션 version}
         # loop
         self.active = True  # loop active
         # tasks
         self.timer_task = None
         self.emergency_task = None
+        self.fill_stream_task = None
+        self.session_task = None
+        self.state_task = None
+        self.election_task = None
+        # leader election (uvicorn worker 여러개 중 하나만 copy engine 실행)
+        lease_ttl = settings.LEADER_LEASE_TTL or 5.0
+        self.leader_election = LeaderElection(self.state_store.path, lease_ttl, lease_ttl / 5)
+        self.engine_running = False
+        # update lock (on_timer_update 중복 실행 방지)
+        self.update_lock = asyncio.Lock()
+        # status snapshot (/view_status)
+        self.status_publisher = StatusPublisher(self.get_status)
 
     async def initialize(self):
         # load all parameters
         logManager.debug(f"params directory: {self.params_dir}")
+        self.state_store.open()
         _betting_params = self.load_params()
         self.set_betting_params(_betting_params, False)
+        exchangeManager.set_pause(bool(self.state_store.get("pause")))
+        self.state_task = asyncio.create_task(self.state_store.run())
+
+        # leader만 copy engine 실행, 나머지 worker는 공유 상태만 읽음
+        self.leader_election.open()
+        if await self.leader_election.try_acquire():
+            exchangeManager.set_lease(self.leader_election.expires_at)
+            await self.start_engine()
+        else:
+            self.sync_shared_state()
+        self.election_task = asyncio.create_task(self.election_loop())
+
+    async def on_shutdown(self):
+        # set active false to stop loops
+        self.active = False
+
+        await self.cancel_task(self.election_task)
+        was_leader = self.engine_running
+        if was_leader:
+            # save all parameters
+            self.save_params()
+            await self.stop_engine()
+        self.leader_election.release()
+
+        await self.cancel_task(self.state_task)
+        self.state_store.close()
+
+        # shutdown complete (Discord 알림은 leader만)
+        if was_leader:
+            await logManager.log_message_async("shutdown complete!")
+        else:
+            logManager.info("follower worker shutdown complete")
+
+    async def cancel_task(self, task: asyncio.Task | None) -> None:
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+    ##############################
+    # Leader election (multi worker)
+    ##############################
+    async def election_loop(self):
+        """
+        renew_interval 마다 lease 연장
+        lease를 얻으면 copy engine 시작, 잃으면 중지
+        """
+        while self.active:
+            await asyncio.sleep(self.leader_election.renew_interval)
+            was_leader = self.engine_running
+            is_leader = await self.leader_election.try_acquire()
+            # 진행 중인 tick의 주문도 lease를 잃는 즉시 멈춤 (stop_engine은 tick이 끝나길 기다림)
+            exchangeManager.set_lease(self.leader_election.expires_at if is_leader else 0.0)
+            if is_leader and not was_leader:
+                logManager.log_message(f"[{self.leader_election.owner}] leader lease acquired, starting copy engine")
+                await self.start_engine()
+            elif not is_leader and was_leader:
+                logManager.log_message(f"[{self.leader_election.owner}] leader lease lost, stopping copy engine")
+                await self.stop_engine()
+            self.sync_shared_state()
+
+    async def start_engine(self):
+        """
+        포지션 복원 -> timer, 토큰 재발급, fill stream 시작 -> 로그인
+        """
+        self.engine_running = True
+
+        # restore positions, order ledger (이전 leader가 마지막으로 저장한 상태)
+        self.state_store.reload()
+        self.restore_state()
 
         # set timer
-        self.timer_task = asyncio.create_task(self.timer_update_1s())
+        self.timer_task = asyncio.create_task(self.timer_update_loop())
         self.timer_task.add_done_callback(self.timer_update_done_callback)
 
         # start emergency control loop
         self.emergency_task = asyncio.create_task(self.emergency_control_loop())
 
-        # init ExchangeManager
-        await exchangeManager.initialize()
+        # init ExchangeManager (COPY_SHARDS > 0 이면 slave는 shard 프로세스에서 처리)
+        await exchangeManager.initialize(settings.COPY_SHARDS or 0)
 
-    async def on_shutdown(self):
-        # save all parameters
-        self.save_params()
+        self.publish_status()
 
-        # set active false to stop loops
-        self.active = False
+        # start token refresh loop
+        self.session_task = asyncio.create_task(exchangeManager.run_session_refresh())
 
-        # cancel tasks
-        if self.timer_task and not self.timer_task.done():
-            self.timer_task.cancel()
-            try:
-                await self.timer_task
-            except asyncio.CancelledError:
-                pass
+        # start master fill stream
+        if settings.USE_FILL_STREAM:
+            self.fill_stream_task = asyncio.create_task(exchangeManager.run_fill_stream())
 
-        if self.emergency_task and not self.emergency_task.done():
-            self.emergency_task.cancel()
-            try:
-                await self.emergency_task
-            except asyncio.CancelledError:
-                pass
+    async def stop_engine(self):
+        """
+        진행 중인 tick이 끝나길 기다린 뒤 loop 중지, 상태 저장, 연결 종료
+        """
+        self.engine_running = False
+        async with self.update_lock:
+            if self.timer_task:
+                # 다시 leader가 될 수 있으므로 active는 그대로 둠
+                self.timer_task.remove_done_callback(self.timer_update_done_callback)
+            await self.cancel_task(self.timer_task)
+        await self.cancel_task(self.emergency_task)
+        await self.cancel_task(self.session_task)
+        await exchangeManager.fill_stream.stop()
+        await self.cancel_task(self.fill_stream_task)
 
-        # shutdown complete
-        await logManager.log_message_async("shutdown complete!")
+        self.save_state()
+        self.state_store.flush()
+        await exchangeManager.close()
+
+    def sync_shared_state(self):
+        """
+        다른 worker가 바꾼 betting params, pause를 반영
+        leader가 아니면 leader가 기록한 status snapshot도 가져옴
+        """
+        saved = self.state_store.read("betting_params")
+        if saved is not None and saved["slave_multiples"] != betting_params.slave_multiples:
+            self.set_betting_params(BettingParams(slave_multiples=saved["slave_multiples"]), False)
+        pause = bool(self.state_store.read("pause"))
+        if pause != exchangeManager.pause:
+            exchangeManager.set_pause(pause)
+            if self.engine_running:
+                self.publish_status()
+
+        if self.engine_running:
+            return
+        status = self.state_store.read("status")
+        if status is None or status["etag"] == self.status_publisher.snapshot.etag:
+            return
+        snapshot = StatusSnapshot(status["version"], status["etag"], status["body"].encode(), status["created_at"])
+        self.status_publisher.snapshot = snapshot
+        eventBroker.publish("status", snapshot.body, snapshot.version)
 
 
     ##############################
     # Parameter setting
     ##############################
     def set_betting_params(self, _betting_params: BettingParams, save:bool = True):
-        global betting_params
+        # 싱글톤 객체를 직접 갱신해야 ExchangeManager에도 반영됨
         if _betting_params is not None:
-            betting_params = _betting_params
+            betting_params.slave_multiples = dict(_betting_params.slave_multiples)
+            exchangeManager.sync_shard_params()
         if save:
             self.save_betting_params()
 
@@ -77,11 +198,8 @@ class Core:
     # Save/Load parameters
     ##############################
     def save_betting_params(self):
-        if not os.path.exists(self.params_dir):
-            os.makedirs(self.params_dir)
-        
-        with open(os.path.join(self.params_dir, "betting_params.pkl"), "wb") as f:
-            pickle.dump(betting_params, f)
+        # 다른 worker가 바로 읽을 수 있도록 즉시 기록
+        self.state_store.write_now("betting_params", {"slave_multiples": betting_params.slave_multiples})
 
     def save_params(self):
         self.save_betting_params()
@@ -95,9 +213,22 @@ class Core:
         return True
 
     def load_betting_params(self):
+        saved = self.state_store.get("betting_params")
+        if saved is not None:
+            return BettingParams(slave_multiples=saved["slave_multiples"])
+
+        # 이전 버전 pickle 파일
         if self.check_file(self.params_dir, "betting_params.pkl"):
             with open(os.path.join(self.params_dir, "betting_params.pkl"), "rb") as f:
-                return pickle.load(f)
+                _betting_params = pickle.load(f)
+            # 이전 버전 (slave1_multiple, slave2_multiple) 변환
+            if not hasattr(_betting_params, "slave_multiples"):
+                _betting_params = BettingParams(slave_multiples={
+                    key.removesuffix("_multiple").upper(): value
+                    for key, value in vars(_betting_params).items()
+                    if key.endswith("_multiple")
+                })
+            return _betting_params
         else:
             return None
 
@@ -105,6 +236,29 @@ class Core:
         _betting_params= self.load_betting_params()
         return _betting_params
 
+    def save_state(self):
+        """
+        계좌별 포지션 (version이 바뀐 경우만), 확인 전 주문 저장 (state_store가 모아서 기록)
+        """
+        for account in exchangeManager.accounts.accounts:
+            if self.saved_versions.get(account.name) != account.version:
+                self.state_store.put(f"positions:{account.name}", {"app_key": account.app_key, "positions": account.positions.nets})
+                self.saved_versions[account.name] = account.version
+            self.state_store.put(f"ledger:{account.name}", account.ledger.to_dict())
+
+    def restore_state(self):
+        """
+        저장된 포지션, 확인 전 주문 복원 (app_key가 같은 계좌만)
+        """
+        for account in exchangeManager.accounts.accounts:
+            saved = self.state_store.get(f"positions:{account.name}")
+            if not saved or saved["app_key"] != account.app_key:
+                continue
+            exchangeManager.restore_account_positions(account, PositionBook.load(saved["positions"]))
+            self.saved_versions[account.name] = account.version
+            account.ledger.load(self.state_store.get(f"ledger:{account.name}") or {})
+            logManager.debug(f"[{account.name}] restored {len(account.positions)} positions, {len(account.ledger)} pending orders")
+
 
     ##############################
     # Emergency Control loop
@@ -119,20 +273,34 @@ class Core:
     # Timer event
     ##############################
     # timer - update
-    async def timer_update_1s(self):
+    async def timer_update_loop(self):
         """
-        매 1초마다 on_timer_update 메서드 호출
+        가장 빠른 계좌 폴링 deadline에 맞춰 on_timer_update 메서드 호출
+        계좌별 주기, burst 모드는 ExchangeManager 설정을 따름
         """
         while self.active:
-            await asyncio.sleep(1)
-            await self.on_timer_update(time.time(), "1s")
+            delay = exchangeManager.next_deadline() - time.monotonic()
+            if delay > 0:
+                await exchangeManager.poll_scheduler.wait(delay)
+                continue
+            await self.on_timer_update(time.time(), "poll")
 
     # on_timer - update
     async def on_timer_update(self, update_timestamp: float, timeframe: str):
         """
         update timer에 의해 호출되는 메서드
         """
-        await exchangeManager.on_timer_update()
+        async with self.update_lock:
+            if not self.leader_election.holds_lease:
+                # lease 연장 전에 만료 (event loop 지연 등) -> 다른 worker가 주문했을 수 있으므로 건너뜀
+                logManager.debug("on_timer_update skipped: leader lease expired")
+                return
+            start = time.perf_counter()
+            with logManager.tick_context():
+                await exchangeManager.on_timer_update()
+                self.publish_status()
+                self.save_state()
+            metrics.tick_seconds.observe(time.perf_counter() - start)
         logManager.trace(f"on_timer_update - {timeframe} 완료")
 
     # done call back - update
@@ -152,27 +320,59 @@ class Core:
     ##############################
     # User Control
     ##############################
-    def set_pause(self, pause: bool) -> None:
+    async def set_pause(self, pause: bool) -> None:
+        # 다른 worker (leader)도 다음 lease 연장 때 반영
+        self.state_store.write_now("pause", pause)
         exchangeManager.set_pause(pause)
+        if self.engine_running:
+            self.publish_status()
+            # shard가 pause를 반영한 뒤에 응답 (이후로는 shard에서도 주문하지 않음)
+            await exchangeManager.wait_shard_params()
+
+    def publish_status(self) -> None:
+        """
+        계좌 version, 연결 상태가 바뀌었을 때만 status snapshot 새로 생성, 바뀌면 /events 구독자에게 push
+        다른 worker가 읽을 수 있도록 state_store에도 저장
+        """
+        key = (exchangeManager.pause,) + tuple(
+            (account.name, account.version, account.connected) for account in exchangeManager.accounts.accounts
+        )
+        version = self.status_publisher.snapshot.version
+        snapshot = self.status_publisher.publish(key)
+        if snapshot.version != version:
+            eventBroker.publish("status", snapshot.body, snapshot.version)
+            self.state_store.put("status", {
+                "version": snapshot.version,
+                "etag": snapshot.etag,
+                "body": snapshot.body.decode(),
+                "created_at": snapshot.created_at,
+            })
 
     def get_status(self) -> dict:
         """
-        master, slave1, slave2 연결 여부, 포지션 상태 반환
+        모든 계좌의 연결 여부, 포지션 상태 반환
         """
+        accounts = exchangeManager.accounts.accounts
         result = {
+            "paused": exchangeManager.pause,
             "connections": {
-                "master_connected": exchangeManager.master.connected,
-                "slave1_connected": exchangeManager.slave1.connected,
-                "slave2_connected": exchangeManager.slave2.connected,
+                f"{account.name.lower()}_connected": account.connected
+                for account in accounts
             },
             "positions": {
-                "master_positions": exchangeManager.master_positions,
-                "slave1_positions": exchangeManager.slave1_positions,
-                "slave2_positions": exchangeManager.slave2_positions,
+                f"{account.name.lower()}_positions": account.positions.to_list()
+                for account in accounts
             }
         }
         return result
     
+    def get_metrics(self) -> str:
+        """
+        Prometheus text (shard 프로세스 지표 포함)
+        """
+        shard_pool = exchangeManager.shard_pool
+        return metrics.render(shard_pool.shard_metrics() if shard_pool else [])
+
     def get_params(self) -> dict:
         """
         현재 betting params 반환
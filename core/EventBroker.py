@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+import asyncio, orjson
+
+
+@dataclass(frozen=True)
+class Event:
+    type: str    # status, order
+    data: bytes  # JSON
+    id: int | None = None
+
+    def encode(self) -> bytes:
+        """
+        Server-Sent Events 형식
+        """
+        lines = [b"event: " + self.type.encode()]
+        if self.id is not None:
+            lines.append(b"id: " + str(self.id).encode())
+        lines.append(b"data: " + self.data)
+        return b"\n".join(lines) + b"\n\n"
+
+
+class EventBroker:
+    """
+    대시보드 push 채널 (/events)
+    - publish는 구독자 queue에 넣기만 하므로 copy loop를 막지 않음
+    - 느린 구독자는 queue가 가득 차면 오래된 이벤트부터 버림
+    """
+    def __init__(self, max_queue: int = 100):
+        self.max_queue = max_queue
+        self.subscribers: set[asyncio.Queue[Event]] = set()
+        self.last_status: Event | None = None  # 새 구독자에게 바로 보낼 마지막 상태
+
+    def subscribe(self) -> asyncio.Queue[Event]:
+        queue: asyncio.Queue[Event] = asyncio.Queue(self.max_queue)
+        if self.last_status is not None:
+            queue.put_nowait(self.last_status)
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[Event]) -> None:
+        self.subscribers.discard(queue)
+
+    def publish(self, type: str, data: bytes | dict, id: int | None = None) -> None:
+        if not isinstance(data, bytes):
+            data = orjson.dumps(data)
+        event = Event(type, data, id)
+        if type == "status":
+            self.last_status = event
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+# singleton
+eventBroker = EventBroker()
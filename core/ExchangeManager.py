@@ -1,95 +1,276 @@
 from .LogManager import logManager
 from .schemas import *
-from typing import Literal
-import asyncio, ebest, copy
+from typing import Literal, TYPE_CHECKING
+import asyncio, ebest, math, time
 from settings import settings
 from datetime import datetime
 from .types import *
+from .AccountRegistry import Account, AccountRegistry, accountRegistry
+from .PositionBook import PositionBook, fingerprint_rows
+from .FillStream import FillStream
+from .Reconciler import PlannedOrder, Reconciler
+from .OrderDispatcher import OrderDispatcher
+from .PollScheduler import PollScheduler
+from .Metrics import metrics
+from .EventBroker import eventBroker
+from .RateLimiter import RateLimiter
+from .RequestScheduler import RequestPriority, RequestScheduler
+from .RetryPolicy import RetryPolicy
+
+if TYPE_CHECKING:
+    from .ShardPool import ShardPool
 
 class ExchangeManager:
     def __init__(self):
-        # exchange API instances
-        self.master: ebest.OpenApi = ebest.OpenApi()
-        self.slave1: ebest.OpenApi = ebest.OpenApi()
-        self.slave2: ebest.OpenApi = ebest.OpenApi()
-
-        # connected status
-        self.master_connected: bool = False
-        self.slave1_connected: bool = False
-        self.slave2_connected: bool = False
-        
-        # positions
-        self.master_positions = []  # [{'code': 종목코드, 'qty': 잔고수량, 'direction': BnsTpCode}, ...]
-        self.slave1_positions = []
-        self.slave2_positions = []
-
-        # prev positions
-        self.prev_master_positions = []
-        self.prev_slave1_positions = []
-        self.prev_slave2_positions = []
+        # accounts (master 1개 + slave N개)
+        self.accounts: AccountRegistry = accountRegistry
 
         # flags
-        self.login_dirty = False
         self.pause = False
-        self.double_check = False
-        self.double_check_counter = 0
-        self.double_check_max = 3
+        self.double_check_at: float | None = None  # 재카피 예정 시각 (time.monotonic)
+
+        # 폴링 주기 (초)
+        self.poll_scheduler = PollScheduler()
+        self.master_poll_interval = settings.MASTER_POLL_INTERVAL or 1.0
+        self.slave_poll_interval = settings.SLAVE_POLL_INTERVAL or 5.0
+        self.burst_poll_interval = settings.BURST_POLL_INTERVAL or 0.5
+        self.burst_duration = settings.BURST_DURATION or 5.0
+        self.double_check_delay = settings.DOUBLE_CHECK_DELAY or 3.0
+        self.reconcile_interval = settings.RECONCILE_INTERVAL or 10.0  # fill stream 연결 중 master 조회 주기
+
+        # master/slave 포지션 차이 계산
+        self.reconciler = Reconciler()
+
+        # 계좌 x TR 별 초당 요청 수 제한
+        self.rate_limiter = RateLimiter(
+            {config["tr_cd"]: float(config["per_second"]) for config in settings.TR_RATE_LIMITS}
+            if settings.TR_RATE_LIMITS else None
+        )
+
+        # slave 주문 동시 전송
+        self.order_dispatcher = OrderDispatcher(settings.ORDER_CONCURRENCY or 2)
+
+        # 계좌별 요청 우선순위 (주문 > 체결 확인 > 주기 잔고 조회), 주문 동시 전송 수만큼 슬롯 확보
+        self.request_scheduler = RequestScheduler(self.order_dispatcher.max_concurrency)
+
+        # 일시적 에러 재시도 (조회는 바로, 주문은 전송되지 않은 것을 확인한 뒤)
+        self.retry_policy = RetryPolicy()
+        self.pending_order_timeout = settings.PENDING_ORDER_TIMEOUT or 10.0
+        self.deferred_poll_delay = 0.2  # 계좌가 바빠서 버려진 잔고 조회를 다시 시도하기까지 (초)
+        self.reconcile_tasks: dict[str, asyncio.Task] = {}  # {계좌 이름: 진행 중인 slave 잔고 조회}
+
+        # master 실시간 체결
+        self.fill_stream = FillStream()
+
+        # 토큰 수명 (초)
+        self.token_ttl = settings.TOKEN_TTL or 12 * 60 * 60
+        self.token_refresh_margin = settings.TOKEN_REFRESH_MARGIN or 10 * 60
+        self.api_close_delay = 15.0  # 재발급 후 이전 API를 닫기까지 대기 (진행 중인 요청 보호)
+        self.background_tasks: set[asyncio.Task] = set()
+
+        # slave를 나눠서 처리하는 shard 프로세스 (initialize에서 shards > 0 일 때만)
+        self.shard_pool: "ShardPool | None" = None
+
+        # leader lease 만료 시각 (time.time), 지나면 주문을 보내지 않음 (다른 worker가 이어받았을 수 있음)
+        self.lease_expires_at: float = math.inf
+
+    @property
+    def master(self) -> Account:
+        return self.accounts.master
+
+    @property
+    def slaves(self) -> list[Account]:
+        return self.accounts.slaves
+
+    @property
+    def engine_accounts(self) -> list[Account]:
+        """
+        이 프로세스가 로그인, 조회하는 계좌 (shard 사용 시 master만, slave는 shard 프로세스가 담당)
+        """
+        if self.shard_pool is not None:
+            return [self.master]
+        return self.accounts.accounts
+
+    async def initialize(self, shards: int = 0) -> None:
+        # slave를 shard 프로세스로 나눔
+        if shards > 0 and self.slaves:
+            from .ShardPool import ShardPool  # multiprocessing은 shard를 쓸 때만 로드
+            self.shard_pool = ShardPool(shards)
+            await self.shard_pool.start(self.master, self.slaves, self.pause, betting_params.slave_multiples, self.lease_expires_at)
 
-    async def initialize(self) -> None:
-        # login
-        await self.login(self.master)
-        await self.login(self.slave1)
-        await self.login(self.slave2)
+        # login (모든 계좌 동시에)
+        await asyncio.gather(*(self.login(account) for account in self.engine_accounts))
 
         # set connected status
-        self.master_connected = self.master._connected
-        self.slave1_connected = self.slave1._connected
-        self.slave2_connected = self.slave2._connected
+        for account in self.engine_accounts:
+            account.connected = account.api._connected
+
+        # 로그인 전에 잠든 timer loop를 깨워서 첫 tick을 바로 실행
+        self.poll_scheduler.wakeup.set()
 
     def get_today(self) -> str:
         return datetime.now().strftime('%Y%m%d')
 
     # 로그인
-    async def login(self, api: ebest.OpenApi, relogin: bool=False) -> bool:
-        app_key = ""
-        secret_key = ""
-        name = ""
-        if api == self.master:
-            app_key = settings.MASTER_APP_KEY
-            secret_key = settings.MASTER_SECRET_KEY
-            name = "master"
-        elif api == self.slave1:
-            app_key = settings.SLAVE1_APP_KEY
-            secret_key = settings.SLAVE1_SECRET_KEY
-            name = "slave1"
-        elif api == self.slave2:
-            app_key = settings.SLAVE2_APP_KEY
-            secret_key = settings.SLAVE2_SECRET_KEY
-            name = "slave2"
-        else:
-            await logManager.log_error_message_async("Unknown API instance", "Login Error")
-            return False
-        
-        login_success = await api.login(app_key, secret_key)
+    async def login(self, account: Account, relogin: bool=False) -> bool:
+        """
+        relogin이면 새 API 인스턴스로 로그인한 뒤 교체
+        이전 API는 진행 중인 요청이 끝나도록 api_close_delay 후에 닫음
+        """
+        api = self.accounts.create_api() if relogin else account.api
+        login_success = await api.login(account.app_key, account.secret_key)
 
         if not login_success:
-            is_ignorable = "appkey or appsecretkey is empty" in api._last_message
+            is_ignorable = "appkey or appsecretkey is empty" in str(api._last_message)
             if not (relogin and is_ignorable):
-                await logManager.log_error_message_async(f"[{name}] {api._last_message}", "API Login Error")
+                await logManager.log_error_message_async(f"[{account.name}] {api._last_message}", "API Login Error")
             return False
 
         # login 성공
+        if api is not account.api:
+            self.run_background(self.close_api_later(account.api))
+            account.api = api
+        now = time.monotonic()
+        account.session_generation += 1
+        account.token_expires_at = now + self.token_ttl
+        account.refresh_at = account.token_expires_at - self.token_refresh_margin
+        account.connected = api._connected
         log_func = (
             logManager.log_debug_message_async
             if relogin
             else logManager.log_message_async
         )
 
-        await log_func(f"[{name}] {'Re-' if relogin else ''}login successful")
+        await log_func(f"[{account.name}] {'Re-' if relogin else ''}login successful")
         return True
 
+    # TR 요청 (지연시간 기록)
+    async def request(self, account: Account, tr_cd: str, inputs: dict,
+                      priority: RequestPriority = RequestPriority.CONFIRM,
+                      deadline: float | None = None) -> ebest.ResponseValue | None:
+        """
+        일시적 에러 (SERVICE_DELAY, 연결 끊김, timeout)면 조회 TR만 jitter backoff 후 재시도
+        deadline (time.monotonic, 없으면 TR 규칙의 budget)을 넘길 재시도는 하지 않음
+        주문 TR은 재시도하지 않음 (submit_planned_order에서 전송 여부 확인 후)
+        """
+        rule = self.retry_policy.get_rule(tr_cd)
+        if deadline is None:
+            deadline = time.monotonic() + rule.budget
+        attempt = 0
+        while True:
+            response = await self.send_request(account, tr_cd, inputs, priority)
+            if response or not account.last_transient or not rule.idempotent:
+                return response
+            delay = self.retry_policy.backoff(rule, attempt)
+            attempt += 1
+            if attempt >= rule.max_attempts or time.monotonic() + delay > deadline:
+                return response
+            metrics.retries_total.inc(account.name, tr_cd)
+            logManager.trace(f"[{account.name}] {tr_cd} {account.last_message}, retry {attempt} in {delay * 1000:.0f}ms")
+            await asyncio.sleep(delay)
+
+    # TR 요청 한번 (지연시간 기록)
+    async def send_request(self, account: Account, tr_cd: str, inputs: dict, priority: RequestPriority) -> ebest.ResponseValue | None:
+        """
+        계좌 안에서는 priority 순서로 슬롯 배정, RECONCILE은 계좌가 바쁘면 보내지 않음 (ErrorMsg.REQUEST_DEFERRED)
+        슬롯을 얻은 뒤 계좌 x TR 제한 속도를 넘지 않도록 대기 후 요청 (대기시간은 지연시간에서 제외)
+        토큰 에러로 실패하면 그 계좌만 재로그인하고 한번 더 요청
+        실패 사유는 account.last_message, account.last_transient에 저장
+        """
+        if not await self.request_scheduler.acquire(account.name, priority):
+            account.last_message = ErrorMsg.REQUEST_DEFERRED.value
+            account.last_transient = False
+            return None
+        try:
+            await self.rate_limiter.acquire(account.name, tr_cd)
+            api = account.api
+            generation = account.session_generation
+            start = time.perf_counter()
+            response = await api.request(tr_cd, inputs)
+            metrics.tr_request_seconds.observe(time.perf_counter() - start, tr_cd)
+
+            if response is None and self.is_token_error(str(api.last_message)):
+                await logManager.log_debug_message_async(f"[{account.name}] {tr_cd} token error, re-login and retry")
+                if await self.refresh_session(account, generation, "token_error"):
+                    await self.rate_limiter.acquire(account.name, tr_cd)
+                    api = account.api
+                    start = time.perf_counter()
+                    response = await api.request(tr_cd, inputs)
+                    metrics.tr_request_seconds.observe(time.perf_counter() - start, tr_cd)
+        finally:
+            self.request_scheduler.release(account.name)
+
+        account.last_message = "" if response else str(api.last_message)
+        account.last_transient = response is None and self.retry_policy.is_transient(api.last_message)
+        return response
+
+    # 토큰 에러 여부
+    def is_token_error(self, rsp_msg: str) -> bool:
+        return ErrorMsg.EXPIRED_TOKEN in rsp_msg or ErrorMsg.INVALID_TOKEN in rsp_msg
+
+    # 계좌 하나의 토큰 재발급
+    async def refresh_session(self, account: Account, generation: int, reason: str) -> bool:
+        """
+        generation: 요청 시점의 session_generation
+        같은 계좌에 동시에 토큰 에러가 나도 재로그인은 한번만 하고, 나머지는 새 토큰을 그대로 사용
+        returns: 새 토큰 사용 가능 여부
+        """
+        async with account.session_lock:
+            if account.session_generation != generation:
+                return account.connected
+            metrics.relogins_total.inc(account.name, reason)
+            if await self.login(account, relogin=True):
+                return True
+            account.refresh_at = time.monotonic() + 60.0  # 실패하면 1분 뒤 다시 시도
+            return False
+
+    # 토큰 만료 전 백그라운드 재발급
+    async def run_session_refresh(self) -> None:
+        """
+        refresh_at이 지난 계좌들을 동시에 재발급
+        """
+        while True:
+            now = time.monotonic()
+            accounts = [account for account in self.engine_accounts if account.connected]
+            due = [account for account in accounts if account.refresh_at <= now]
+            if due:
+                await asyncio.gather(*(
+                    self.refresh_session(account, account.session_generation, "expiry")
+                    for account in due
+                ))
+                continue
+            next_refresh = min((account.refresh_at for account in accounts), default=now + 60.0)
+            await asyncio.sleep(min(max(next_refresh - now, 0.0), 60.0))
+
+    async def close_api_later(self, api: ebest.OpenApi) -> None:
+        await asyncio.sleep(self.api_close_delay)
+        await api.close()
+
+    def run_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+
+    async def close(self) -> None:
+        """
+        모든 계좌 연결 종료 (leader에서 물러날 때), 다시 leader가 되면 새 API로 로그인
+        """
+        for task in list(self.background_tasks):
+            task.cancel()
+        self.reconcile_tasks.clear()
+        if self.shard_pool is not None:
+            await self.shard_pool.stop()
+            self.shard_pool = None
+        for account in self.accounts.accounts:
+            api, account.api = account.api, self.accounts.create_api()
+            account.connected = False
+            account.refresh_at = account.token_expires_at = math.inf
+            await api.close()
+
     # 해외선물 미결제잔고내역 조회
-    async def fetch_open_positions(self, api: ebest.OpenApi, type: APIType) -> None | list[dict]:
+    async def fetch_open_positions(self, account: Account,
+                                   priority: RequestPriority = RequestPriority.RECONCILE,
+                                   deadline: float | None = None) -> None | list[dict]:
         """
         해외선물 미결제잔고내역 조회
         returns: list(dict)
@@ -112,28 +293,69 @@ class ExchangeManager:
                 'BalTpCode': BalTpCode.COMBINED, # 잔고구분코드
             },
         }
-        response = await api.request('CIDBQ01500', inputs)
+        response = await self.request(account, 'CIDBQ01500', inputs, priority, deadline)
         if not response: 
-            await logManager.log_fetch_positions_error_message_async(f'API Request Error({api.last_message})', type)
-            self.check_rsp_msg(str(api.last_message))
+            if account.last_message == ErrorMsg.REQUEST_DEFERRED:
+                logManager.trace(f"[{account.name}] CIDBQ01500 deferred, account busy")
+                return None
+            await logManager.log_fetch_positions_error_message_async(f'API Request Error({account.last_message})', account.name)
+            self.check_rsp_msg(account, account.last_message)
             return None
         if 'CIDBQ01500OutBlock2' in response.body:
             return response.body['CIDBQ01500OutBlock2']
         else:
-            await logManager.log_fetch_positions_error_message_async(response.response_text, type)
-            self.check_rsp_msg(str(response.response_text))
+            await logManager.log_fetch_positions_error_message_async(response.response_text, account.name)
+            self.check_rsp_msg(account, str(response.response_text))
+            return None
+
+    # 해외선물 주문내역 조회
+    async def fetch_order_history(self, account: Account, IsuCodeVal: str) -> None | list[dict]:
+        """
+        해외선물 주문체결내역 조회 (당일, 종목 하나)
+        returns: list(dict)
+        예) [{
+                'OvrsFutsOrdNo':'0000000136',  # 해외선물주문번호
+                'IsuCodeVal':'MNQH26',         # 종목코드
+                'BnsTpCode':'2',               # 매매구분코드
+                'OrdQty':2,                    # 주문수량
+                'ExecQty':2,                   # 체결수량
+                'UnercQty':0,                  # 미체결수량
+            }, ... ]
+        """
+        inputs = {
+            'CIDBQ01800InBlock1': {
+                'IsuCodeVal': IsuCodeVal, # 종목코드값
+                'OrdDt': self.get_today(), # 주문일자
+                'ThdayTpCode': SPACE, # 당일구분코드
+                'OrdStatCode': '0', # 주문상태코드 (0:전체)
+                'BnsTpCode': '0', # 매매구분코드 (0:전체)
+                'QryTpCode': '1', # 조회구분코드 (1:역순)
+                'OrdPtnCode': '00', # 주문유형코드 (00:전체)
+                'OvrsDrvtFnoTpCode': 'A', # 해외파생선물옵션구분코드 (A:전체)
+            },
+        }
+        response = await self.request(account, 'CIDBQ01800', inputs, RequestPriority.CONFIRM)
+        if not response:
+            logManager.debug(f"[{account.name}] order history request error({account.last_message})")
+            self.check_rsp_msg(account, account.last_message)
+            return None
+        if 'CIDBQ01800OutBlock2' in response.body:
+            return response.body['CIDBQ01800OutBlock2']
+        else:
+            logManager.debug(f"[{account.name}] order history error: {response.response_text}")
+            self.check_rsp_msg(account, str(response.response_text))
             return None
 
     # 해외선물 신규주문
     async def request_new_order(self, 
-                                api: ebest.OpenApi, 
+                                account: Account, 
                                 IsuCodeVal: str, # 종목코드
                                 _BnsTpCode: BnsTpCode, # 매매구분코드
                                 _AbrdFutsOrdPtnCode: AbrdFutsOrdPtnCode, # 해외선물주문유형코드
                                 OvrsDrvtOrdPrc: float, # 해외파생주문가격
                                 CndiOrdPrc: float, # 조건주문가격
                                 OrdQty: int, # 주문수량
-                                type: APIType,
+                                priority: RequestPriority = RequestPriority.ORDER,
                             ) -> None | dict:
         """
         해외선물 신규주문
@@ -159,24 +381,25 @@ class ExchangeManager:
                 'ExchCode': SPACE, # 거래소코드
             },
         }
-        response = await api.request('CIDBT00100', inputs)
+        response = await self.request(account, 'CIDBT00100', inputs, priority)
         if not response: 
-            await logManager.log_order_error_message_async(f'API Request Error({api.last_message})', inputs['CIDBT00100InBlock1'], type)
-            self.check_rsp_msg(str(api.last_message))
+            await logManager.log_order_error_message_async(f'API Request Error({account.last_message})', inputs['CIDBT00100InBlock1'], account.name)
+            self.check_rsp_msg(account, account.last_message)
             return None
         if 'CIDBT00100OutBlock2' in response.body:
-            await logManager.log_order_message_async(inputs['CIDBT00100InBlock1'], type)
+            await logManager.log_order_message_async(inputs['CIDBT00100InBlock1'], account.name)
             return response.body['CIDBT00100OutBlock2']
         else:
-            await logManager.log_order_error_message_async(response.response_text, inputs['CIDBT00100InBlock1'], type)
-            self.check_rsp_msg(str(response.response_text))
+            await logManager.log_order_error_message_async(response.response_text, inputs['CIDBT00100InBlock1'], account.name)
+            self.check_rsp_msg(account, str(response.response_text))
             return None
 
     # 해외선물 취소주문
     async def request_cancel_order(self, 
-                                   api: ebest.OpenApi,
+                                   account: Account,
                                     IsuCodeVal: str, # 종목코드
                                     OvrsFutsOrgOrdNo: str, # 해외선물원주문번호
+                                    priority: RequestPriority = RequestPriority.ORDER,
                                 ) -> None | dict:
         """
         해외선물 취소주문
@@ -196,205 +419,419 @@ class ExchangeManager:
                 'ExchCode': SPACE, # 거래소코드
             },
         }
-        response = await api.request('CIDBT01000', inputs)
+        response = await self.request(account, 'CIDBT01000', inputs, priority)
         if not response: 
-            await logManager.log_cancel_order_error_message_async(f'API Request Error({api.last_message})', inputs['CIDBT01000InBlock1'], type)
-            self.check_rsp_msg(str(api.last_message))
+            await logManager.log_cancel_order_error_message_async(f'API Request Error({account.last_message})', inputs['CIDBT01000InBlock1'], account.name)
+            self.check_rsp_msg(account, account.last_message)
             return None
         if 'CIDBT01000OutBlock2' in response.body:
-            await logManager.log_cancel_order_message_async(inputs['CIDBT01000InBlock1'], type)
+            await logManager.log_cancel_order_message_async(inputs['CIDBT01000InBlock1'], account.name)
             return response.body['CIDBT01000OutBlock2']
         else:
-            await logManager.log_cancel_order_error_message_async(response.response_text, inputs['CIDBT01000InBlock1'], type)
-            self.check_rsp_msg(str(response.response_text))
+            await logManager.log_cancel_order_error_message_async(response.response_text, inputs['CIDBT01000InBlock1'], account.name)
+            self.check_rsp_msg(account, str(response.response_text))
             return None
 
-    # 포지션 업데이트
-    async def update_positions(self) -> None:
-        # master positions
-        if self.master_connected:
-            master_positions = await self.fetch_open_positions(self.master, APIType.MASTER)
-            if master_positions is not None:
-                self.master_positions = [{'code': pos['IsuCodeVal'], 'qty': int(pos['BalQty']), 'direction': pos['BnsTpCode']} for pos in master_positions]
-
-        # slave1 positions
-        if self.slave1_connected:
-            slave1_positions = await self.fetch_open_positions(self.slave1, APIType.SLAVE1)
-            if slave1_positions is not None:
-                self.slave1_positions = [{'code': pos['IsuCodeVal'], 'qty': int(pos['BalQty']), 'direction': pos['BnsTpCode']} for pos in slave1_positions]
-
-        # slave2 positions
-        if self.slave2_connected:
-            slave2_positions = await self.fetch_open_positions(self.slave2, APIType.SLAVE2)
-            if slave2_positions is not None:
-                self.slave2_positions = [{'code': pos['IsuCodeVal'], 'qty': int(pos['BalQty']), 'direction': pos['BnsTpCode']} for pos in slave2_positions]
+    # 저장된 포지션 복원 (재시작)
+    def restore_account_positions(self, account: Account, positions: PositionBook) -> None:
+        """
+        복원한 포지션을 이미 처리한 것으로 표시해서 재시작 직후 카피가 다시 일어나지 않도록 함
+        """
+        account.positions = positions
+        account.version += 1
+        account.synced_version = account.version
+        account.changed_at = time.perf_counter()
 
-    # 포지션 카피
-    async def copy_positions(self):
+    # 계좌 하나의 포지션 조회 및 반영
+    async def update_account_positions(self, account: Account) -> bool:
+        """
+        잔고 row fingerprint가 이전 book과 같으면 book을 새로 만들지 않음
+        바뀌었으면 포지션 교체 후 version 증가
+        returns: 계좌가 바빠서 조회가 버려졌으면 False (폴링하지 않은 것으로 처리)
         """
-        master에 있는 포지션을 slave1, slave2에 카피
+        # master 조회는 변화 감지라서 slave 주기 조회보다 우선, 재시도는 다음 폴링 전까지만
+        priority = RequestPriority.CONFIRM if account is self.master else RequestPriority.RECONCILE
+        now = time.monotonic()
+        rows = await self.fetch_open_positions(account, priority, now + self.get_poll_interval(account, now))
+        if rows is None:
+            return account.last_message != ErrorMsg.REQUEST_DEFERRED
+        fingerprint = fingerprint_rows(rows)
+        if fingerprint == account.positions.fingerprint:
+            if account.ledger.codes:
+                await self.settle_pending_orders(account, account.positions)
+            return True
+        book = PositionBook.from_rows(rows, fingerprint)
+        if account.ledger.codes:
+            await self.settle_pending_orders(account, book)
+        if book == account.positions:
+            account.positions = book  # 내용은 같고 row 순서만 다름 -> 다음 조회부터 fingerprint로 건너뜀
+            return True
+        account.positions = book
+        account.version += 1
+        account.changed_at = time.perf_counter()
+        return True
+
+    # 확인 전 주문 정리
+    async def settle_pending_orders(self, account: Account, book: PositionBook) -> None:
         """
-        if self.slave1_connected:
-            await self.copy_positions_to_slave(self.slave1, self.slave1_positions, APIType.SLAVE1)
-        if self.slave2_connected:
-            await self.copy_positions_to_slave(self.slave2, self.slave2_positions, APIType.SLAVE2)
+        잔고에 반영된 주문은 확인 처리, pending_order_timeout이 지난 주문은 버림
+        """
+        confirmed, expired = account.ledger.settle(book.nets, time.monotonic(), self.pending_order_timeout)
+        for order in confirmed:
+            logManager.trace(f"[{account.name}] order {order.order_no} {order.code} {order.qty:+d} confirmed")
+        for order in expired:
+            await logManager.log_debug_message_async(
+                f"[{account.name}] order {order.order_no} {order.code} {order.qty:+d} not confirmed in {self.pending_order_timeout}s, dropped from ledger")
 
-    async def copy_positions_to_slave(self, slave_api: ebest.OpenApi, slave_positions: list[dict], type: APIType):
+    # 확인 전 주문 체결 확인
+    async def confirm_pending_orders(self, account: Account) -> None:
         """
-        master_positions와 slave_positions를 비교해서 차이만큼 주문
+        ledger에 있는 주문만 주문번호로 체결 여부 확인 (잔고 전체를 다시 조회하지 않음)
+        - 체결된 주문: 잔고에 반영될 때까지 계속 pending으로 계산
+        - 체결 없이 끝난 주문 (거부, 취소): ledger에서 바로 제거해서 다음 카피에서 다시 주문
         """
-        if not slave_api._connected:
-            await logManager.log_error_message_async("Slave API not connected", "Connection Error")
+        codes = list(account.ledger.codes)
+        if not codes:
             return
+        histories = await asyncio.gather(*(self.fetch_order_history(account, code) for code in codes))
+        now = time.monotonic()
+        for code, rows in zip(codes, histories):
+            if rows is None:
+                continue
+            for row in rows:
+                exec_qty = int(row.get('ExecQty') or 0)
+                open_qty = int(row['UnercQty']) if row.get('UnercQty') not in (None, '') else int(row.get('OrdQty') or 0) - exec_qty
+                order = account.ledger.update_order(row.get('OvrsFutsOrdNo', ''), code, exec_qty, open_qty)
+                if order is None:
+                    continue
+                if order.filled:
+                    metrics.fill_confirm_seconds.observe(now - order.sent_at, account.name)
+                    logManager.trace(f"[{account.name}] order {order.order_no} {code} {order.qty:+d} filled")
+                else:
+                    await logManager.log_debug_message_async(f"[{account.name}] order {order.order_no} {code} closed without fill")
+
+    # 포지션 업데이트
+    async def update_positions(self, accounts: list[Account] | None = None) -> list[Account]:
+        """
+        계좌들의 미결제잔고를 동시에 조회 (None이면 연결된 모든 계좌)
+        master 요청을 가장 먼저 보내고, 응답이 도착한 계좌부터 바로 포지션에 반영
+        소요시간은 가장 느린 계좌 한 건의 왕복시간 수준
+        returns: 계좌가 바빠서 조회가 버려진 계좌
+        """
+        if accounts is None:
+            accounts = self.engine_accounts
+        accounts = [account for account in accounts if account.connected]
+        if not accounts:
+            return []
+        polled = await asyncio.gather(*(asyncio.create_task(self.update_account_positions(account)) for account in accounts))
+        return [account for account, ok in zip(accounts, polled) if not ok]
+
+    # 다음 폴링 deadline 설정
+    def finish_poll(self, account: Account, polled: bool, now: float) -> None:
+        """
+        polled: update_account_positions 결과
+        now: 폴링을 시작한 시각 (time.monotonic)
+        """
+        if polled:
+            self.poll_scheduler.advance(account.name, self.get_poll_interval(account, now), time.monotonic())
+        else:
+            # 버려진 조회는 다음 주기까지 미루지 않고 곧 다시 시도 (잔고가 오래된 채로 ledger를 정리하지 않도록)
+            self.poll_scheduler.retry(account.name, self.deferred_poll_delay, time.monotonic())
+
+    # slave 잔고 조회 (백그라운드)
+    def start_reconcile(self, account: Account, now: float) -> None:
+        """
+        계좌별로 하나만 실행, 끝나기 전에는 다음 tick에서 다시 조회하지 않음
+        """
+        task = asyncio.create_task(self.reconcile_account(account, now))
+        self.reconcile_tasks[account.name] = task
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
 
-        # 모든 종목 코드 수집
-        all_codes = set()
-        for pos in self.master_positions:
-            all_codes.add(pos['code'])
-        for pos in slave_positions:
-            all_codes.add(pos['code'])
-
-        # 종목별로 차이 계산 및 주문
-        for code in all_codes:
-            # master의 net position 계산 (LONG: +, SHORT: -)
-            master_net = 0
-            for pos in self.master_positions:
-                if pos['code'] == code:
-                    if pos['direction'] == BnsTpCode.LONG:
-                        master_net += pos['qty']
-                    elif pos['direction'] == BnsTpCode.SHORT:
-                        master_net -= pos['qty']
-
-            # slave의 net position 계산 (LONG: +, SHORT: -)
-            slave_net = 0
-            for pos in slave_positions:
-                if pos['code'] == code:
-                    if pos['direction'] == BnsTpCode.LONG:
-                        slave_net += pos['qty']
-                    elif pos['direction'] == BnsTpCode.SHORT:
-                        slave_net -= pos['qty']
-
-            # 필요한 주문량과 방향 계산
-            multiple = 1
-            if (type == APIType.SLAVE1):
-                multiple = betting_params.slave1_multiple
-            elif (type == APIType.SLAVE2):
-                multiple = betting_params.slave2_multiple
-            diff = master_net * multiple - slave_net
-            
-            if diff == 0:
-                continue  # 차이가 없으면 주문할 필요 없음
-                
-            order_qty = abs(diff)
-            order_direction = BnsTpCode.LONG if diff > 0 else BnsTpCode.SHORT
-            
+    async def reconcile_account(self, account: Account, now: float) -> None:
+        try:
             try:
+                polled = await self.update_account_positions(account)
+            except Exception as e:
+                await logManager.log_error_message_async(f"[{account.name}] reconcile error: {e}", "Reconcile Error")
+                polled = True  # 다음 주기에 다시 조회
+            self.finish_poll(account, polled, now)
+        finally:
+            if self.reconcile_tasks.get(account.name) is asyncio.current_task():
+                del self.reconcile_tasks[account.name]
+            self.poll_scheduler.wakeup.set()  # 조회 중에는 next_deadline에서 빠져 있었음
+
+    # 계좌별 잔고 조회 주기
+    def get_poll_interval(self, account: Account, now: float) -> float:
+        """
+        burst는 master만 (slave 주문은 ledger + 주문내역 조회로 확인)
+        """
+        if account is self.master:
+            if self.poll_scheduler.is_burst(now):
+                return self.burst_poll_interval
+            if self.fill_stream.connected:
+                return self.reconcile_interval
+            return self.master_poll_interval
+        return account.poll_interval or self.slave_poll_interval
+
+    # 다음 tick 시각
+    def next_deadline(self) -> float:
+        """
+        returns: 가장 빠른 계좌 폴링 deadline 또는 재카피 시각 (time.monotonic)
+        """
+        now = time.monotonic()
+        if self.pause:
+            return now + 1.0
+        names = [
+            account.name for account in self.engine_accounts
+            if account.connected and account.name not in self.reconcile_tasks
+        ]
+        deadline = self.poll_scheduler.next_deadline(names)
+        if self.double_check_at is not None:
+            deadline = min(deadline, self.double_check_at)
+        return min(deadline, now + 1.0)
+
+    # slave 배수
+    def get_multiple(self, slave: Account) -> int:
+        return betting_params.slave_multiples.get(slave.name, slave.multiple)
+
+    # 포지션 카피
+    async def copy_positions(self, detected_at: float | None = None):
+        """
+        master에 있는 포지션을 모든 slave에 카피
+        모든 slave의 주문 계획을 한번에 계산한 뒤 동시에 주문
+        detected_at: master 변화 감지 시각 (time.perf_counter), 있으면 카피 지연시간 기록
+        """
+        slaves = []
+        for slave in self.slaves:
+            if not slave.connected:
+                continue
+            if not slave.api._connected:
+                await logManager.log_error_message_async(f"[{slave.name}] Slave API not connected", "Connection Error")
+                continue
+            slaves.append(slave)
+
+        multiples = [self.get_multiple(slave) for slave in slaves]
+        plan = self.reconciler.plan(self.master.positions, slaves, multiples)
+        results = await self.order_dispatcher.dispatch(plan, self.submit_planned_order)
+
+        # metrics, dashboard
+        for result in results:
+            name = result.order.account.name
+            eventBroker.publish("order", {
+                "account": name,
+                "code": result.order.code,
+                "direction": result.order.direction.name,
+                "qty": result.order.qty,
+                "order_no": result.response['OvrsFutsOrdNo'] if result.response else None,
+                "result": "failure" if result.response is None else "success",
+                "submit_ms": round(result.submit_ms, 1),
+            })
+            if result.response is None:
+                metrics.orders_total.inc(name, "failure")
+                continue
+            metrics.orders_total.inc(name, "success")
+            if detected_at is not None:
+                metrics.copy_latency_seconds.observe(result.accepted_at - detected_at, name)
+
+    async def submit_planned_order(self, order: PlannedOrder) -> None | dict:
+        """
+        주문 계획 하나를 시장가 주문으로 전송
+        일시적 에러로 실패하면 backoff 후 주문내역에서 실제로 전송되지 않았는지 확인하고 재시도
+        (응답만 못 받고 접수된 주문이 있으면 다시 보내지 않고 ledger에 추가)
+        재시도는 double check 전까지만
+        """
+        account = order.account
+        rule = self.retry_policy.get_rule('CIDBT00100')
+        deadline = time.monotonic() + min(rule.budget, self.double_check_delay)
+        qty = order.qty if order.direction == BnsTpCode.LONG else -order.qty
+        attempt = 0
+        try:
+            while True:
+                if not self.holds_lease():
+                    await logManager.log_debug_message_async(
+                        f"[{account.name}] order {order.code} {qty:+d} not sent: leader lease expired")
+                    return None
+                if self.pause:
+                    await logManager.log_debug_message_async(f"[{account.name}] order {order.code} {qty:+d} not sent: paused")
+                    return None
                 result = await self.request_new_order(
-                    api=slave_api,
-                    IsuCodeVal=code,
-                    _BnsTpCode=order_direction,
+                    account=account,
+                    IsuCodeVal=order.code,
+                    _BnsTpCode=order.direction,
                     _AbrdFutsOrdPtnCode=AbrdFutsOrdPtnCode.MARKET,
                     OvrsDrvtOrdPrc=0,  # 시장가이므로 0
                     CndiOrdPrc=0,
-                    OrdQty=order_qty,
-                    type=type
+                    OrdQty=order.qty,
                 )
-                
-                # if not result:
-                #     self.login_dirty = True
-                    
-            except Exception as e:
-                await logManager.log_error_message_async(f"[{type.value}]Error ordering {code}: {str(e)}", "Order Error")
-        
-    # 포지션 두개 비교
-    def compare_positions(self, a: list[dict], b: list[dict]) -> bool:
+                if result:
+                    account.ledger.add(result['OvrsFutsOrdNo'], order.code, qty, order.base_qty, time.monotonic(), self.get_today())
+                    return result
+                if not account.last_transient:
+                    return None
+
+                delay = self.retry_policy.backoff(rule, attempt)
+                attempt += 1
+                if attempt >= rule.max_attempts or time.monotonic() + delay > deadline:
+                    return None
+                await asyncio.sleep(delay)
+
+                # 전송 여부 확인
+                checked, row = await self.find_untracked_order(order)
+                if not checked:
+                    return None  # 확인할 수 없으면 재시도하지 않음 (double check에서 다시 계산)
+                if row is not None:
+                    await logManager.log_debug_message_async(
+                        f"[{account.name}] order {row['OvrsFutsOrdNo']} {order.code} {qty:+d} was accepted without response")
+                    account.ledger.add(row['OvrsFutsOrdNo'], order.code, qty, order.base_qty, time.monotonic(), self.get_today())
+                    return {'AcntNo': row.get('AcntNo', ''), 'OvrsFutsOrdNo': row['OvrsFutsOrdNo']}
+                metrics.retries_total.inc(account.name, 'CIDBT00100')
+
+        except Exception as e:
+            await logManager.log_error_message_async(f"[{order.account.name}]Error ordering {order.code}: {str(e)}", "Order Error")
+            return None
+
+    async def find_untracked_order(self, order: PlannedOrder) -> tuple[bool, dict | None]:
         """
-        두 포지션 리스트가 동일한지 비교
-        포지션 리스트 type : [{'code': 종목코드, 'qty': 잔고수량, 'direction': BnsTpCode}, ...]
-        
-        returns: True if equal, False if not
+        주문내역에서 ledger에 없는 같은 방향, 같은 수량의 새 주문 찾기
+        오늘 응답 받은 주문번호가 없으면 (재시작 후 첫 주문 등) 이전에 체결된 주문과 구분할 수 없으므로 확인하지 않음
+        returns: (확인 여부, 찾은 주문내역 row)
         """
-        if len(a) != len(b):
-            return False
-        a_sorted = sorted(a, key=lambda x: x['code'])
-        b_sorted = sorted(b, key=lambda x: x['code'])
-        return a_sorted == b_sorted
-    
+        if not order.account.ledger.has_baseline(self.get_today()):
+            logManager.debug(f"[{order.account.name}] no order number baseline today, leaving {order.code} to double check")
+            return False, None
+        rows = await self.fetch_order_history(order.account, order.code)
+        if rows is None:
+            return False, None
+        for row in rows:
+            if (order.account.ledger.is_untracked(row.get('OvrsFutsOrdNo', ''))
+                    and row.get('BnsTpCode') == order.direction
+                    and int(row.get('OrdQty') or 0) == order.qty):
+                return True, row
+        return True, None
+
     # 타이머 업데이트
     async def on_timer_update(self) -> None:
         """
-        모든 계좌의 포지션 업데이트
+        폴링 deadline이 된 계좌의 포지션 업데이트 (master는 기다리고 slave는 백그라운드)
         master가 달라진게 있는지 체크
-        master에 변화가 있으면 slave1, slave2에 카피
+        master에 변화가 있으면 모든 slave에 카피하고 burst 모드 시작
+        double_check_delay 후에 slave 주문 체결을 확인하고 한번 더 카피
+        slave 잔고는 주문 확인과 별개로 slave 주기마다 조회 (reconcile)
         """
         if self.pause:
             return
 
-        # check login dirty
-        if self.login_dirty:
-            await logManager.log_debug_message_async("Re-login due to login dirty...")
-            await self.relogin()
-            self.login_dirty = False
-
         # update positions
-        await self.update_positions()
-        
+        now = time.monotonic()
+        double_check = self.double_check_at is not None and self.double_check_at <= now
+        due_accounts = [
+            account for account in self.engine_accounts
+            if account.connected
+            and account.name not in self.reconcile_tasks
+            and self.poll_scheduler.is_due(account.name, now)
+        ]
+        # slave 잔고 조회 (reconcile)는 기다리지 않음 -> 느린 slave 조회 때문에 master 카피가 늦어지지 않도록
+        for account in due_accounts:
+            if account is not self.master:
+                self.start_reconcile(account, now)
+        if self.master in due_accounts:
+            polled = await self.update_account_positions(self.master)
+            self.finish_poll(self.master, polled, now)
+
         # compare master positions
-        if not self.compare_positions(self.master_positions, self.prev_master_positions):
-            await logManager.log_position_change_message_async(self.master_positions)
+        if self.master.version != self.master.synced_version:
+            self.master.synced_version = self.master.version
+            if self.master.connected:  # shard 프로세스는 master를 조회하지 않음 (coordinator가 로그)
+                await logManager.log_position_change_message_async(self.master.positions)
             # log_message_async("Master positions changed, copying to slaves...")
-            await self.copy_positions()
-            self.double_check = True
-            self.double_check_counter = 0
+            if self.shard_pool is not None:
+                # 카피, double check는 각 shard에서
+                self.shard_pool.broadcast_master(self.master)
+            else:
+                await self.copy_positions(self.master.changed_at)
+            now = time.monotonic()
+            self.poll_scheduler.start_burst(
+                [self.master.name],
+                self.burst_poll_interval,
+                self.burst_duration,
+                now,
+            )
+            if self.shard_pool is None:
+                self.double_check_at = now + self.double_check_delay
 
         # double check
-        if self.double_check:
-            self.double_check_counter += 1
-            if self.double_check_counter >= self.double_check_max:
-                # copy positions again
-                await logManager.log_debug_message_async("Double check: copying positions again...")
-                await self.copy_positions()
-                self.double_check = False
-                self.double_check_counter = 0
-                
-
-        # save prev positions
-        self.prev_master_positions = copy.deepcopy(self.master_positions)
-        self.prev_slave1_positions = copy.deepcopy(self.slave1_positions)
-        self.prev_slave2_positions = copy.deepcopy(self.slave2_positions)
+        elif double_check:
+            # copy positions again
+            await logManager.log_debug_message_async("Double check: copying positions again...")
+            await asyncio.gather(*(
+                self.confirm_pending_orders(slave)
+                for slave in self.slaves
+                if slave.connected and slave.ledger.codes
+            ))
+            await self.copy_positions()
+            self.double_check_at = None
+
+    # master 실시간 체결 수신
+    async def run_fill_stream(self) -> None:
+        url = settings.FILL_STREAM_URL
+        if not url:
+            url = ebest.WSS_URL_SIMULATION if self.master.api.is_simulation else ebest.WSS_URL_REAL
+        await self.fill_stream.run(url, lambda: self.master.api._access_token, self.on_master_fill)
+
+    async def on_master_fill(self, body: dict) -> None:
+        """
+        master 체결 발생 -> 다음 폴링을 기다리지 않고 바로 master를 조회하도록 deadline을 당김
+        연속 체결은 tick 하나로 합쳐짐
+        """
+        logManager.debug(f"[{self.master.name}] fill received: {body}")
+        self.poll_scheduler.trigger(self.master.name)
 
     # set pause
     def set_pause(self, pause: bool) -> None:
         self.pause = pause
+        self.sync_shard_params()
+        self.poll_scheduler.wakeup.set()
+
+    # shard 프로세스에 pause, 배수 전달
+    def sync_shard_params(self) -> None:
+        """
+        pause, betting params가 바뀔 때마다 호출 (paused 동안은 on_timer_update가 실행되지 않음)
+        """
+        if self.shard_pool is not None:
+            self.shard_pool.sync_params(self.pause, betting_params.slave_multiples)
+
+    async def wait_shard_params(self) -> None:
+        """
+        shard가 마지막 pause, 배수를 반영할 때까지 대기
+        """
+        if self.shard_pool is not None and not await self.shard_pool.wait_params():
+            await logManager.log_error_message_async("copy shards did not apply params in time", "Shard Error")
+
+    # leader lease
+    def set_lease(self, expires_at: float) -> None:
+        """
+        lease를 연장하거나 잃을 때마다 호출 (Core election loop), shard 프로세스에도 전달
+        """
+        self.lease_expires_at = expires_at
+        if self.shard_pool is not None:
+            self.shard_pool.sync_lease(expires_at)
+
+    def holds_lease(self) -> bool:
+        """
+        주문 전송 직전에 확인 (tick이 길어지는 사이 lease가 만료됐으면 주문하지 않음)
+        """
+        return time.time() < self.lease_expires_at
     
     # check response message
-    def check_rsp_msg(self, rsp_msg: str):
-        if ErrorMsg.EXPIRED_TOKEN in rsp_msg:
-            self.login_dirty = True
-        elif ErrorMsg.INVALID_TOKEN in rsp_msg:
-            self.login_dirty = True
+    def check_rsp_msg(self, account: Account, rsp_msg: str):
+        if self.is_token_error(rsp_msg):
+            # 재시도 후에도 토큰 에러 -> 해당 계좌만 백그라운드에서 재로그인
+            self.run_background(self.refresh_session(account, account.session_generation, "token_error"))
         elif ErrorMsg.SERVICE_DELAY in rsp_msg:
             return
         elif ErrorMsg.NOT_ENOUGH_BALANCE in rsp_msg:
             return
 
-    # relogin
-    async def relogin(self) -> None:
-        # login
-        if self.master_connected:
-            await self.master.close()
-            await self.login(self.master)
-        if self.slave1_connected:
-            await self.slave1.close()
-            await self.login(self.slave1)
-        if self.slave2_connected:
-            await self.slave2.close()
-            await self.login(self.slave2)
-
-        # set connected status
-        self.master_connected = self.master._connected
-        self.slave1_connected = self.slave1._connected
-        self.slave2_connected = self.slave2._connected
-
 # singleton instance
 exchangeManager = ExchangeManager()
@@ -0,0 +1,86 @@
+from .LogManager import logManager
+from typing import Awaitable, Callable
+import aiohttp, asyncio, json
+
+
+class FillStream:
+    """
+    LS 실시간 계좌 체결 수신 (WebSocket)
+    계좌등록(tr_type=1) 후 TC3(해외선물 주문체결)가 들어오면 on_fill 콜백 호출
+    연결이 끊기면 지수 백오프로 재접속
+    """
+    def __init__(self, tr_codes: tuple[str, ...] = ("TC3",)):
+        self.tr_codes = tr_codes
+        self.connected: bool = False
+        self.active: bool = False
+        self.reconnect_delay: float = 1.0
+        self.max_reconnect_delay: float = 30.0
+        self._websocket: aiohttp.ClientWebSocketResponse | None = None
+
+    async def run(self, url: str, get_token: Callable[[], str], on_fill: Callable[[dict], Awaitable[None]]) -> None:
+        """
+        url: WebSocket 주소 (로컬 테스트 서버 주소도 가능)
+        get_token: 접속할 때마다 호출해서 최신 access token 사용
+        on_fill: 체결 body(dict)를 받는 코루틴 함수
+        """
+        self.active = True
+        delay = self.reconnect_delay
+        while self.active:
+            token = get_token()
+            if not token:
+                # 아직 로그인 전
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(url, heartbeat=30) as websocket:
+                        self._websocket = websocket
+                        await self.subscribe(websocket, token)
+                        self.connected = True
+                        delay = self.reconnect_delay
+                        logManager.info(f"[FillStream] connected: {url}")
+                        async for msg in websocket:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                await self.on_text(msg.data, on_fill)
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logManager.warning(f"[FillStream] connection error: {e}")
+            finally:
+                self.connected = False
+                self._websocket = None
+
+            if not self.active:
+                break
+            logManager.debug(f"[FillStream] reconnect in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def stop(self) -> None:
+        self.active = False
+        if self._websocket is not None and not self._websocket.closed:
+            await self._websocket.close()
+
+    async def subscribe(self, websocket: aiohttp.ClientWebSocketResponse, token: str) -> None:
+        for tr_cd in self.tr_codes:
+            await websocket.send_str(json.dumps({
+                "header": {"token": token, "tr_type": "1"},  # 1: 계좌등록
+                "body": {"tr_cd": tr_cd, "tr_key": ""},
+            }))
+
+    async def on_text(self, text: str, on_fill: Callable[[dict], Awaitable[None]]) -> None:
+        try:
+            data = json.loads(text)
+        except ValueError:
+            logManager.warning(f"[FillStream] invalid message: {text}")
+            return
+
+        header = data.get("header") or {}
+        body = data.get("body")
+        tr_cd = header.get("tr_cd")
+        if header.get("rsp_msg") is not None:
+            logManager.debug(f"[FillStream] {tr_cd}: {header.get('rsp_msg')}")
+        if body and tr_cd in self.tr_codes:
+            await on_fill(body)
@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING
+import asyncio, os, socket, time, uuid
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+class LeaderElection:
+    """
+    SQLite lease 기반 leader 선출
+    uvicorn worker가 여러개여도 copy engine (timer loop, 주문)은 lease를 가진 worker 하나만 실행
+    - leader는 renew_interval 마다 lease를 ttl 만큼 연장
+    - leader 프로세스가 죽어서 ttl 동안 연장이 없으면 다른 worker가 가져감 (최대 ttl + renew_interval)
+    - 정상 종료 시 release로 바로 넘겨줌
+    """
+    NAME = "engine"
+
+    def __init__(self, path: str, ttl: float = 5.0, renew_interval: float = 1.0):
+        self.path = path
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.conn: "sqlite3.Connection | None" = None
+        self.is_leader = False
+        self.expires_at = 0.0  # 내 lease 만료 시각 (time.time)
+
+    def open(self) -> None:
+        if self.conn is not None:
+            return
+        import sqlite3  # main import 시간에서 제외 (open은 startup에서 호출)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=self.renew_interval, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+        self.conn.commit()
+
+    @property
+    def holds_lease(self) -> bool:
+        """
+        lease가 아직 유효한지 (event loop가 오래 멈춘 사이 다른 worker가 가져갔을 수 있으므로 주문 전에 확인)
+        """
+        return self.is_leader and time.time() < self.expires_at
+
+    def acquire(self) -> bool:
+        """
+        lease 획득 또는 연장 (lease가 비었거나, 만료됐거나, 내 것일 때만)
+        returns: leader 여부
+        """
+        import sqlite3
+        now = time.time()
+        expires_at = now + self.ttl
+        try:
+            with self.conn:
+                self.conn.execute(
+                    "INSERT INTO lease (name, owner, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                    "WHERE lease.owner = excluded.owner OR lease.expires_at < ?",
+                    (self.NAME, self.owner, expires_at, now),
+                )
+                row = self.conn.execute("SELECT owner FROM lease WHERE name = ?", (self.NAME,)).fetchone()
+        except sqlite3.OperationalError:
+            # DB lock 등으로 연장 실패 -> 기존 lease가 남아 있는 동안만 leader 유지
+            self.is_leader = self.holds_lease
+            return self.is_leader
+
+        self.is_leader = row is not None and row[0] == self.owner
+        if self.is_leader:
+            self.expires_at = expires_at
+        return self.is_leader
+
+    async def try_acquire(self) -> bool:
+        return await asyncio.to_thread(self.acquire)
+
+    def release(self) -> None:
+        if self.conn is None:
+            return
+        if self.is_leader:
+            with self.conn:
+                self.conn.execute("UPDATE lease SET expires_at = 0 WHERE name = ? AND owner = ?", (self.NAME, self.owner))
+        self.is_leader = False
+        self.conn.close()
+        self.conn = None
@@ -3,30 +3,23 @@ from settings import settings
 from typing import Literal
 from dhooks import Embed
 from .types import *
+from .PositionBook import PositionBook
 
 class LogManager(BaseLogManager):
-    def __init__(self, discord_webhook_url: str | None = None):
-        super().__init__(discord_webhook_url)
+    def __init__(self, discord_webhook_url: str | None = None, json_logs: bool = False):
+        super().__init__(discord_webhook_url, json_logs)
 
 
     # 포지션 변경 메세지
     @log_level_under("INFO")
-    async def log_position_change_message_async(self, positions: list[dict]):
+    async def log_position_change_message_async(self, positions: PositionBook):
         """
-        positions =
-            [
-                {
-                    'code': 'MNQH23',  # 종목코드
-                    'qty': 2,          # 수량
-                    'direction': BnsTpCode.LONG,  # 매매구분코드
-                },
-                ...
-            ]
+        positions = PositionBook({'MNQH23': 2, ...})  # {종목코드: net 수량}
         """
         description_lines = []
         for pos in positions:
-            direction = "LONG" if pos['direction'] == BnsTpCode.LONG else "SHORT"
-            description_lines.append(f"[{pos['code']}] {direction} / Qty : {pos['qty']}")
+            direction = "LONG" if pos.direction == BnsTpCode.LONG else "SHORT"
+            description_lines.append(f"[{pos.code}] {direction} / Qty : {pos.qty}")
         description = "\n".join(description_lines)
 
         embed = Embed(
@@ -39,7 +32,7 @@ class LogManager(BaseLogManager):
 
     # 신규 주문 메세지
     @log_level_under("DEBUG")
-    async def log_order_message_async(self, order_info: dict, type: APIType):
+    async def log_order_message_async(self, order_info: dict, name: str):
         """
         order_info =
             {
@@ -59,7 +52,7 @@ class LogManager(BaseLogManager):
         """
         direction = "LONG" if order_info['BnsTpCode'] == BnsTpCode.LONG else "SHORT"
         embed = Embed(
-            title=f"[{type.value}] 신규 주문",
+            title=f"[{name}] 신규 주문",
             description=f"[{order_info['IsuCodeVal']}] {direction} / Qty : {order_info['OrdQty']}",
             color=0x0000FF,
         )
@@ -68,7 +61,7 @@ class LogManager(BaseLogManager):
 
     # 취소 주문 메세지
     @log_level_under("DEBUG")
-    async def log_cancel_order_message_async(self, order_info: dict, type: APIType):
+    async def log_cancel_order_message_async(self, order_info: dict, name: str):
         """
         order_info =
             {
@@ -81,7 +74,7 @@ class LogManager(BaseLogManager):
             }
         """
         embed = Embed(
-            title=f"[{type.value}] 취소 주문",
+            title=f"[{name}] 취소 주문",
             description=f"[{order_info['IsuCodeVal']}] Order No. : {order_info['OvrsFutsOrgOrdNo']}",
             color=0xFFFFFF,
         )
@@ -91,7 +84,7 @@ class LogManager(BaseLogManager):
     # -------------------------------------------- ERROR MESSAGES --------------------------------------------
     # 신규 주문 에러 메세지
     @log_level_under("ERROR")
-    async def log_order_error_message_async(self, error: str | Exception, order_info: dict, type: APIType):
+    async def log_order_error_message_async(self, error: str | Exception, order_info: dict, name: str):
         """
         order_info =
             {
@@ -113,7 +106,7 @@ class LogManager(BaseLogManager):
             error = self.get_error(error)
 
         embed = Embed(
-            title=f"[{type.value}] 신규 주문 실패",
+            title=f"[{name}] 신규 주문 실패",
             description=f"[{order_info['IsuCodeVal']}] Qty : {order_info['OrdQty']}\nError: {error}",
             color=0xFF0000,
         )
@@ -122,7 +115,7 @@ class LogManager(BaseLogManager):
 
     # 취소 주문 에러 메세지
     @log_level_under("ERROR")
-    async def log_cancel_order_error_message_async(self, error: str | Exception, order_info: dict, type: APIType):
+    async def log_cancel_order_error_message_async(self, error: str | Exception, order_info: dict, name: str):
         """
         order_info =
             {
@@ -138,7 +131,7 @@ class LogManager(BaseLogManager):
             error = self.get_error(error)
 
         embed = Embed(
-            title=f"[{type.value}] 취소 주문 실패",
+            title=f"[{name}] 취소 주문 실패",
             description=f"[{order_info['IsuCodeVal']}] Order No. : {order_info['OvrsFutsOrgOrdNo']}\nError: {error}",
             color=0xFF0000,
         )
@@ -147,12 +140,12 @@ class LogManager(BaseLogManager):
 
     # 포지션 조회 에러 메세지
     @log_level_under("ERROR")
-    async def log_fetch_positions_error_message_async(self, error: str | Exception, type: APIType):
+    async def log_fetch_positions_error_message_async(self, error: str | Exception, name: str):
         if isinstance(error, Exception):
             error = self.get_error(error)
 
         embed = Embed(
-            title=f"[{type.value}] 포지션 조회 실패",
+            title=f"[{name}] 포지션 조회 실패",
             description=f"Error: {error}",
             color=0xFF0000,
         )
@@ -160,4 +153,4 @@ class LogManager(BaseLogManager):
 
 
 # singleton
-logManager = LogManager(settings.DISCORD_WEBHOOK_URL)
+logManager = LogManager(settings.DISCORD_WEBHOOK_URL, bool(settings.LOG_JSON))
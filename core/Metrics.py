@@ -0,0 +1,160 @@
+import bisect
+
+# latency histogram 기본 bucket (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(label_names: tuple[str, ...], labels: tuple, le: str | None = None) -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(label_names, labels)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    단조 증가 카운터
+    """
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def dump(self) -> list:
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+    def merge(self, data: list) -> None:
+        for labels, value in data:
+            self.inc(*labels, amount=value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class HistogramSeries:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """
+    Prometheus histogram
+    observe는 bucket 이진탐색 + 덧셈만 하므로 hot path에서 사용해도 부담 없음
+    """
+    def __init__(self, name: str, description: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self.series: dict[tuple[str, ...], HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = HistogramSeries(len(self.buckets) + 1)
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def dump(self) -> list:
+        return [[list(labels), series.counts, series.sum, series.count] for labels, series in self.series.items()]
+
+    def merge(self, data: list) -> None:
+        for labels, counts, total, count in data:
+            labels = tuple(labels)
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = HistogramSeries(len(self.buckets) + 1)
+            series.counts = [a + b for a, b in zip(series.counts, counts)]
+            series.sum += total
+            series.count += count
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names, labels, str(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(self.label_names, labels, '+Inf')} {series.count}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, labels)} {series.sum}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, labels)} {series.count}")
+        return lines
+
+
+class Metrics:
+    """
+    lscopybot 지표 모음, /metrics 에서 Prometheus text 형식으로 노출
+    """
+    def __init__(self):
+        self.tr_request_seconds = Histogram(
+            "lscopybot_tr_request_seconds", "LS OpenApi TR request latency", ("tr_cd",))
+        self.tick_seconds = Histogram(
+            "lscopybot_tick_seconds", "on_timer_update duration")
+        self.copy_latency_seconds = Histogram(
+            "lscopybot_copy_latency_seconds", "Master change detected -> slave order accepted", ("account",))
+        self.orders_total = Counter(
+            "lscopybot_orders_total", "Slave orders by result", ("account", "result"))
+        self.fill_confirm_seconds = Histogram(
+            "lscopybot_fill_confirm_seconds", "Slave order accepted -> fill confirmed by order inquiry", ("account",))
+        self.relogins_total = Counter(
+            "lscopybot_relogins_total", "Token re-issues by reason (expiry, token_error)", ("account", "reason"))
+        self.rate_limit_wait_seconds = Histogram(
+            "lscopybot_rate_limit_wait_seconds", "Time a TR request waited for its per-account rate limit", ("account", "tr_cd"),
+            buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+        self.request_queue_seconds = Histogram(
+            "lscopybot_request_queue_seconds", "Time a TR request waited for a per-account request slot", ("account", "priority"),
+            buckets=(0.0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+        self.requests_dropped_total = Counter(
+            "lscopybot_requests_dropped_total", "Low priority TR requests skipped because the account was busy", ("account", "priority"))
+        self.retries_total = Counter(
+            "lscopybot_retries_total", "TR requests retried after a transient error (SERVICE_DELAY, connection)", ("account", "tr_cd"))
+        self.rate_limited_total = Counter(
+            "lscopybot_rate_limited_total", "TR requests delayed by the per-account rate limit", ("account", "tr_cd"))
+
+    @property
+    def collectors(self) -> list[Counter | Histogram]:
+        return [self.tr_request_seconds, self.tick_seconds, self.copy_latency_seconds, self.fill_confirm_seconds,
+                self.rate_limit_wait_seconds, self.request_queue_seconds,
+                self.orders_total, self.relogins_total, self.rate_limited_total, self.requests_dropped_total,
+                self.retries_total]
+
+    def dump(self) -> dict[str, list]:
+        """
+        다른 프로세스 (shard)로 보낼 값 (JSON)
+        """
+        return {collector.name: collector.dump() for collector in self.collectors}
+
+    def render(self, shards: list[dict[str, list]] = ()) -> str:
+        """
+        shards: shard 프로세스들의 dump, 있으면 합쳐서 출력
+        """
+        if shards:
+            total = Metrics()
+            for data in [self.dump(), *shards]:
+                for collector in total.collectors:
+                    collector.merge(data.get(collector.name, []))
+            return total.render()
+        lines = []
+        for collector in self.collectors:
+            lines.extend(collector.render())
+        return "\n".join(lines) + "\n"
+
+
+# singleton
+metrics = Metrics()
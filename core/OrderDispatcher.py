@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from .LogManager import logManager
+from .Reconciler import PlannedOrder
+import asyncio, time
+
+
+@dataclass
+class OrderResult:
+    """
+    주문 전송 결과
+    """
+    order: PlannedOrder
+    response: dict | None   # CIDBT00100OutBlock2, 실패시 None
+    submit_ms: float        # 주문 전송 ~ 응답까지 걸린 시간
+    queued_ms: float        # dispatch 시작 ~ 전송 시작까지 대기 시간
+    accepted_at: float      # 응답 받은 시각 (time.perf_counter)
+
+
+class OrderDispatcher:
+    """
+    모든 slave의 주문을 동시에 전송
+    계좌별 동시 주문 수는 max_concurrency 개로 제한
+    """
+    def __init__(self, max_concurrency: int = 2):
+        self.max_concurrency = max_concurrency
+        self.semaphores: dict[str, asyncio.Semaphore] = {}
+        self.last_results: list[OrderResult] = []
+
+    def get_semaphore(self, name: str) -> asyncio.Semaphore:
+        semaphore = self.semaphores.get(name)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.semaphores[name] = semaphore
+        return semaphore
+
+    async def dispatch(self, plan: list[PlannedOrder], submit: Callable[[PlannedOrder], Awaitable[dict | None]]) -> list[OrderResult]:
+        """
+        plan의 모든 주문을 계좌별 제한 안에서 동시에 전송
+        returns: plan 순서대로 OrderResult
+        """
+        if not plan:
+            return []
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._submit(order, submit, start) for order in plan))
+        self.last_results = list(results)
+
+        total_ms = (time.perf_counter() - start) * 1000
+        slowest = max(results, key=lambda r: r.queued_ms + r.submit_ms)
+        logManager.debug(
+            f"[OrderDispatcher] {len(results)} orders in {total_ms:.1f} ms "
+            f"(slowest: [{slowest.order.account.name}] {slowest.order.code} "
+            f"queued {slowest.queued_ms:.1f} ms + submit {slowest.submit_ms:.1f} ms)"
+        )
+        return self.last_results
+
+    async def _submit(self, order: PlannedOrder, submit: Callable[[PlannedOrder], Awaitable[dict | None]], start: float) -> OrderResult:
+        async with self.get_semaphore(order.account.name):
+            submit_start = time.perf_counter()
+            response = await submit(order)
+            submit_end = time.perf_counter()
+        result = OrderResult(
+            order=order,
+            response=response,
+            submit_ms=(submit_end - submit_start) * 1000,
+            queued_ms=(submit_start - start) * 1000,
+            accepted_at=submit_end,
+        )
+        logManager.trace(f"[{order.account.name}] {order.code} {order.direction.name} {order.qty} submit {result.submit_ms:.1f} ms")
+        return result
@@ -0,0 +1,182 @@
+from dataclasses import dataclass, field
+import time
+
+
+def order_number(order_no: str) -> int:
+    """
+    주문번호 ('0000000136') 비교용 정수, 숫자가 아니면 0
+    """
+    return int(order_no) if order_no.isdigit() else 0
+
+
+@dataclass
+class PendingOrder:
+    """
+    전송은 됐지만 아직 잔고에서 확인되지 않은 주문
+    """
+    order_no: str   # 해외선물주문번호 (OvrsFutsOrdNo)
+    code: str       # 종목코드
+    qty: int        # net 수량 (LONG: +, SHORT: -)
+    sent_at: float  # 주문 응답 시각 (time.monotonic)
+    filled: bool = False  # 주문내역 조회로 체결 확인됨 (잔고 반영 전까지는 계속 pending)
+
+
+@dataclass
+class CodeLedger:
+    base_qty: int  # 가장 오래된 pending 주문 전송 시점의 잔고 net 수량
+    orders: list[PendingOrder] = field(default_factory=list)
+
+
+class OrderLedger:
+    """
+    계좌 하나의 확인 전 주문 목록
+    - 잔고 조회 결과에 아직 반영되지 않은 주문 수량을 계좌의 유효 net 포지션에 더해서
+      재카피(double check) 때 같은 주문을 다시 보내지 않도록 함
+    - 잔고 net 수량이 base_qty에서 주문 수량만큼 움직이면 오래된 주문부터 확인 처리
+    - timeout이 지나도 확인되지 않은 주문은 버리고 잔고를 그대로 믿음
+    """
+    def __init__(self):
+        self.codes: dict[str, CodeLedger] = {}
+        self.last_order_no: str = ""    # 마지막으로 응답 받은 주문번호 (state에 저장, 재시작 후에도 유지)
+        self.last_order_date: str = ""  # last_order_no의 주문일자 (YYYYMMDD, 주문번호는 날짜별)
+
+    def __len__(self) -> int:
+        return sum(len(ledger.orders) for ledger in self.codes.values())
+
+    def add(self, order_no: str, code: str, qty: int, base_qty: int, now: float, order_date: str = "") -> None:
+        """
+        order_date: 주문일자 (YYYYMMDD), 날짜가 바뀌면 last_order_no를 새로 시작
+        """
+        ledger = self.codes.get(code)
+        if ledger is None:
+            ledger = self.codes[code] = CodeLedger(base_qty)
+        ledger.orders.append(PendingOrder(order_no, code, qty, now))
+        if order_date != self.last_order_date or order_number(order_no) > order_number(self.last_order_no):
+            self.last_order_no = order_no
+            self.last_order_date = order_date
+
+    def has_baseline(self, order_date: str) -> bool:
+        """
+        order_date에 응답 받은 주문이 있는지 (없으면 주문내역에서 어느 주문이 새 주문인지 구분할 수 없음)
+        """
+        return bool(self.last_order_no) and self.last_order_date == order_date
+
+    def is_untracked(self, order_no: str) -> bool:
+        """
+        ledger에 없고 마지막으로 응답 받은 주문보다 나중에 접수된 주문인지
+        (응답을 받지 못했지만 실제로는 전송된 주문 찾기, has_baseline이 True일 때만 사용)
+        """
+        if order_number(order_no) <= order_number(self.last_order_no):
+            return False
+        return all(order.order_no != order_no for ledger in self.codes.values() for order in ledger.orders)
+
+    def pending_qty(self, code: str) -> int:
+        ledger = self.codes.get(code)
+        return sum(order.qty for order in ledger.orders) if ledger else 0
+
+    def pending_nets(self, nets: dict[str, int]) -> dict[str, int]:
+        """
+        nets: 조회한 잔고 {종목코드: net 수량}
+        returns: {종목코드: 확인 전 주문 중 아직 잔고에 반영되지 않은 net 수량}
+        일부만 체결된 주문은 이미 잔고에 들어간 수량 (nets - base_qty)을 빼서 두번 계산하지 않음
+        (settle은 주문 수량 전체가 반영돼야 확인 처리)
+        """
+        pending: dict[str, int] = {}
+        for code, ledger in self.codes.items():
+            qty = sum(order.qty for order in ledger.orders)
+            unreflected = qty - (nets.get(code, 0) - ledger.base_qty)
+            pending[code] = max(0, min(qty, unreflected)) if qty > 0 else min(0, max(qty, unreflected))
+        return pending
+
+    def update_order(self, order_no: str, code: str, exec_qty: int, open_qty: int) -> PendingOrder | None:
+        """
+        주문내역 조회 결과 반영
+        exec_qty: 체결수량, open_qty: 미체결수량
+        미체결이 남아 있으면 그대로 두고, 끝난 주문은 체결된 수량만 남김 (체결 0이면 ledger에서 제거)
+        returns: 끝난 주문 (아직 진행 중이거나 없으면 None)
+        """
+        ledger = self.codes.get(code)
+        if ledger is None or open_qty > 0:
+            return None
+        for i, order in enumerate(ledger.orders):
+            if order.order_no != order_no:
+                continue
+            if order.filled:
+                return None
+            if exec_qty <= 0:
+                del ledger.orders[i]
+                if not ledger.orders:
+                    del self.codes[code]
+            else:
+                order.qty = exec_qty if order.qty > 0 else -exec_qty
+                order.filled = True
+            return order
+        return None
+
+    def settle(self, nets: dict[str, int], now: float, timeout: float) -> tuple[list[PendingOrder], list[PendingOrder]]:
+        """
+        잔고 조회 결과로 pending 주문 정리
+        nets: 조회한 잔고 {종목코드: net 수량}
+        returns: (확인된 주문, timeout으로 버린 주문)
+        """
+        confirmed: list[PendingOrder] = []
+        expired: list[PendingOrder] = []
+        for code in list(self.codes):
+            ledger = self.codes[code]
+            moved = nets.get(code, 0) - ledger.base_qty
+            while ledger.orders:
+                order = ledger.orders[0]
+                if moved == 0 or (moved > 0) != (order.qty > 0) or abs(order.qty) > abs(moved):
+                    break
+                ledger.orders.pop(0)
+                ledger.base_qty += order.qty
+                moved -= order.qty
+                confirmed.append(order)
+
+            if ledger.orders and now - ledger.orders[0].sent_at > timeout:
+                while ledger.orders and now - ledger.orders[0].sent_at > timeout:
+                    expired.append(ledger.orders.pop(0))
+                # 확인 못한 주문을 버렸으므로 기준 잔고를 현재 잔고로 다시 잡음
+                ledger.base_qty = nets.get(code, 0)
+
+            if not ledger.orders:
+                del self.codes[code]
+        return confirmed, expired
+
+    def to_dict(self) -> dict:
+        """
+        저장용 dict (sent_at은 재시작 후에도 timeout 계산이 되도록 time.time 기준으로 변환)
+        """
+        offset = time.time() - time.monotonic()
+        codes = {
+            code: {
+                "base_qty": ledger.base_qty,
+                "orders": [
+                    {"order_no": order.order_no, "qty": order.qty, "sent_at": round(order.sent_at + offset, 3), "filled": order.filled}
+                    for order in ledger.orders
+                ],
+            }
+            for code, ledger in self.codes.items()
+        }
+        return {"codes": codes, "last_order_no": self.last_order_no, "last_order_date": self.last_order_date}
+
+    def load(self, data: dict) -> None:
+        """
+        data: to_dict 결과 (이전 버전은 {종목코드: ...}만 저장)
+        """
+        if "codes" in data:
+            self.last_order_no = data.get("last_order_no", "")
+            self.last_order_date = data.get("last_order_date", "")
+            data = data["codes"]
+        offset = time.time() - time.monotonic()
+        self.codes = {
+            code: CodeLedger(
+                base_qty=int(value["base_qty"]),
+                orders=[
+                    PendingOrder(order["order_no"], code, int(order["qty"]), order["sent_at"] - offset, order.get("filled", False))
+                    for order in value["orders"]
+                ],
+            )
+            for code, value in data.items()
+            if value["orders"]
+        }
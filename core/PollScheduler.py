@@ -0,0 +1,70 @@
+import asyncio, math, time
+
+
+class PollScheduler:
+    """
+    계좌별 폴링 deadline 관리
+    deadline은 고정 grid (이전 deadline + 주기)로 진행해서 tick 소요시간만큼 밀리지 않음
+    처리가 늦어져 지나간 deadline은 몰아서 실행하지 않고 건너뜀
+    """
+    def __init__(self):
+        self.deadlines: dict[str, float] = {}  # {계좌 이름: 다음 폴링 시각 (time.monotonic)}
+        self.skipped: dict[str, int] = {}      # {계좌 이름: 건너뛴 tick 수}
+        self.deferred: dict[str, int] = {}     # {계좌 이름: 바빠서 다시 시도한 폴링 수}
+        self.burst_until: float = 0.0
+        self.wakeup = asyncio.Event()
+
+    def is_due(self, name: str, now: float) -> bool:
+        return self.deadlines.get(name, 0.0) <= now
+
+    def next_deadline(self, names: list[str]) -> float:
+        if not names:
+            return math.inf
+        return min(self.deadlines.get(name, 0.0) for name in names)
+
+    def advance(self, name: str, interval: float, now: float) -> None:
+        """
+        폴링 완료 후 다음 deadline 설정
+        """
+        deadline = self.deadlines.get(name, now) + interval
+        if deadline <= now:
+            missed = math.floor((now - deadline) / interval) + 1
+            deadline += missed * interval
+            self.skipped[name] = self.skipped.get(name, 0) + missed
+        self.deadlines[name] = deadline
+
+    def retry(self, name: str, delay: float, now: float) -> None:
+        """
+        폴링하지 못했을 때 (요청이 버려짐) 주기만큼 미루지 않고 delay 후 다시 폴링
+        """
+        self.deadlines[name] = now + delay
+        self.deferred[name] = self.deferred.get(name, 0) + 1
+
+    def trigger(self, name: str) -> None:
+        """
+        바로 폴링하도록 deadline을 당김
+        """
+        self.deadlines[name] = time.monotonic()
+        self.wakeup.set()
+
+    def is_burst(self, now: float) -> bool:
+        return now < self.burst_until
+
+    def start_burst(self, names: list[str], interval: float, duration: float, now: float) -> None:
+        """
+        duration 동안 names 계좌를 interval 주기로 폴링
+        """
+        self.burst_until = now + duration
+        for name in names:
+            self.deadlines[name] = min(self.deadlines.get(name, 0.0), now + interval)
+        self.wakeup.set()
+
+    async def wait(self, timeout: float) -> None:
+        """
+        timeout 동안 대기, trigger/start_burst가 호출되면 바로 깨어남
+        """
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeup.clear()
@@ -0,0 +1,109 @@
+from typing import Iterator, NamedTuple
+from .types import *
+
+
+def fingerprint_rows(rows: list[dict]) -> int:
+    """
+    CIDBQ01500 OutBlock2 row fingerprint (종목코드, 매매구분코드, 잔고수량)
+    응답 순서가 같으면 같은 값 -> book을 만들기 전에 이전 값과 비교해서 바뀌지 않은 잔고는 건너뜀
+    """
+    return hash(tuple((row['IsuCodeVal'], row['BnsTpCode'], row['BalQty']) for row in rows))
+
+
+class Position(NamedTuple):
+    """
+    종목 하나의 포지션
+    """
+    code: str             # 종목코드
+    qty: int              # 잔고수량 (양수)
+    direction: BnsTpCode  # 매매구분코드 (LONG, SHORT)
+
+
+class PositionBook:
+    """
+    계좌 하나의 포지션 {종목코드: net 수량 (LONG: +, SHORT: -)}
+    - CIDBQ01500 OutBlock2 row에서 바로 생성 (중간 리스트 없음)
+    - 종목 조회 O(1), 다른 book과 비교는 dict 비교 한번
+    - 만든 뒤에는 바꾸지 않음 (tick 사이에 공유해도 복사 불필요)
+    - fingerprint: 만든 row의 fingerprint_rows 값 (row에서 만들지 않았으면 None)
+    """
+    __slots__ = ("nets", "fingerprint")
+
+    def __init__(self, nets: dict[str, int] | None = None, fingerprint: int | None = None):
+        self.nets: dict[str, int] = nets if nets is not None else {}
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_rows(cls, rows: list[dict], fingerprint: int | None = None) -> "PositionBook":
+        """
+        rows: CIDBQ01500OutBlock2 (IsuCodeVal, BnsTpCode, BalQty)
+        fingerprint: 이미 계산한 fingerprint_rows(rows) 값 (없으면 계산)
+        """
+        nets: dict[str, int] = {}
+        for row in rows:
+            qty = int(row['BalQty'])
+            if row['BnsTpCode'] == BnsTpCode.SHORT:
+                qty = -qty
+            elif row['BnsTpCode'] != BnsTpCode.LONG:
+                continue
+            code = row['IsuCodeVal']
+            net = nets.get(code, 0) + qty
+            if net:
+                nets[code] = net
+            else:
+                nets.pop(code, None)
+        return cls(nets, fingerprint_rows(rows) if fingerprint is None else fingerprint)
+
+    @classmethod
+    def load(cls, data: dict[str, int] | list[dict]) -> "PositionBook":
+        """
+        저장된 값 복원 ({종목코드: net} 또는 이전 버전의 [{'code', 'qty', 'direction'}, ...])
+        """
+        if isinstance(data, dict):
+            return cls({code: int(net) for code, net in data.items() if net})
+        book = cls.from_rows([
+            {'IsuCodeVal': pos['code'], 'BalQty': pos['qty'], 'BnsTpCode': pos['direction']}
+            for pos in data
+        ])
+        book.fingerprint = None  # 저장된 값이라 조회 응답 row와 비교할 수 없음
+        return book
+
+    def get(self, code: str) -> int:
+        return self.nets.get(code, 0)
+
+    def __len__(self) -> int:
+        return len(self.nets)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.nets
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PositionBook):
+            return False
+        if self.fingerprint is not None and self.fingerprint == other.fingerprint:
+            return True  # 같은 응답 row에서 만든 book
+        return self.nets == other.nets
+
+    def __iter__(self) -> Iterator[Position]:
+        for code, net in self.nets.items():
+            yield Position(code, abs(net), BnsTpCode.LONG if net > 0 else BnsTpCode.SHORT)
+
+    def __repr__(self) -> str:
+        return f"PositionBook({self.nets})"
+
+    def diff(self, other: "PositionBook", multiple: int = 1) -> dict[str, int]:
+        """
+        returns: {종목코드: self * multiple - other} (차이가 있는 종목만)
+        """
+        result = {}
+        for code in self.nets.keys() | other.nets.keys():
+            qty = self.nets.get(code, 0) * multiple - other.nets.get(code, 0)
+            if qty:
+                result[code] = qty
+        return result
+
+    def to_list(self) -> list[dict]:
+        """
+        /view_status 응답용 [{'code', 'qty', 'direction'}, ...]
+        """
+        return [{'code': pos.code, 'qty': pos.qty, 'direction': pos.direction} for pos in self]
@@ -0,0 +1,80 @@
+from .Metrics import metrics
+import asyncio, math, time
+
+# LS OpenAPI TR별 초당 전송 가능 건수 (계좌 = app key 기준), TR_RATE_LIMITS 설정으로 변경 가능
+DEFAULT_TR_RATE_LIMITS: dict[str, float] = {
+    "CIDBQ01500": 2.0,   # 해외선물 미결제잔고내역 조회
+    "CIDBQ01800": 2.0,   # 해외선물 주문체결내역 조회
+    "CIDBT00100": 10.0,  # 해외선물 신규주문
+    "CIDBT01000": 10.0,  # 해외선물 취소주문
+}
+
+
+class TokenBucket:
+    """
+    초당 rate 건, 최대 capacity 건까지 몰아서 전송
+    토큰이 없으면 음수로 예약해서 요청 순서대로 (FIFO) 다음 토큰 시각까지 대기
+    """
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def reserve(self, now: float) -> float:
+        """
+        토큰 하나 예약
+        returns: 전송까지 기다려야 하는 시간 (초)
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1.0
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1.0)
+
+
+class RateLimiter:
+    """
+    계좌 x TR 별 token bucket
+    LS 제한을 넘어서 SERVICE_DELAY로 거부되기 전에 제한 바로 아래 속도로 줄을 세워서 전송
+    - margin: 제한 대비 실제 사용 비율 (서버와의 시계 차이, 네트워크 지터 여유)
+    - 제한이 없는 TR은 대기 없이 바로 전송
+    """
+    def __init__(self, limits: dict[str, float] | None = None, margin: float = 0.9):
+        self.limits = dict(DEFAULT_TR_RATE_LIMITS if limits is None else limits)
+        self.margin = margin
+        self.buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def get_bucket(self, account: str, tr_cd: str, now: float) -> TokenBucket | None:
+        bucket = self.buckets.get((account, tr_cd))
+        if bucket is None:
+            limit = self.limits.get(tr_cd)
+            if not limit:
+                return None
+            bucket = TokenBucket(limit * self.margin, max(1.0, math.floor(limit * self.margin)), now)
+            self.buckets[(account, tr_cd)] = bucket
+        return bucket
+
+    async def acquire(self, account: str, tr_cd: str) -> float:
+        """
+        전송 가능할 때까지 대기
+        returns: 대기한 시간 (초)
+        """
+        now = time.monotonic()
+        bucket = self.get_bucket(account, tr_cd, now)
+        if bucket is None:
+            return 0.0
+        wait = bucket.reserve(now)
+        if wait > 0:
+            metrics.rate_limited_total.inc(account, tr_cd)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.refund()  # 전송하지 않은 예약은 반납
+                raise
+        metrics.rate_limit_wait_seconds.observe(wait, account, tr_cd)
+        return wait
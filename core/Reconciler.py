@@ -0,0 +1,57 @@
+from dataclasses import dataclass
+from .AccountRegistry import Account
+from .PositionBook import PositionBook
+from .types import *
+
+
+@dataclass
+class PlannedOrder:
+    """
+    reconcile 결과 주문 하나
+    """
+    account: Account
+    code: str            # 종목코드
+    direction: BnsTpCode # 매매구분코드
+    qty: int             # 주문수량
+    base_qty: int = 0    # 주문 계획 시점의 slave 잔고 net 수량 (확인 전 주문 제외)
+
+
+class Reconciler:
+    """
+    master와 모든 slave의 종목별 net 수량 차이를 한번에 계산하고 주문 계획 생성
+    - 배수별 목표 수량 (master_net * 배수)은 한번만 계산
+    - 확인 전 주문이 없고 잔고가 목표와 같은 slave (대부분의 tick)는 dict 비교 한번으로 건너뜀
+    """
+    def plan(self, master_positions: PositionBook, slaves: list[Account], multiples: list[int]) -> list[PlannedOrder]:
+        """
+        slave j, 종목 i 주문량 = master_net[i] * multiples[j] - (slave_net[j, i] + pending[j, i])
+        pending: 전송했지만 아직 잔고에 반영되지 않은 주문 수량 (slave.ledger, 일부 체결분 제외)
+        returns: 차이가 있는 (slave, 종목) 주문 목록
+        """
+        targets: dict[int, dict[str, int]] = {}  # {배수: {종목코드: 목표 net 수량}}
+        orders: list[PlannedOrder] = []
+        for slave, multiple in zip(slaves, multiples):
+            target = targets.get(multiple)
+            if target is None:
+                target = targets[multiple] = {
+                    code: qty * multiple for code, qty in master_positions.nets.items() if qty * multiple
+                }
+            slave_nets = slave.positions.nets
+            pending_nets = slave.ledger.pending_nets(slave_nets) if slave.ledger.codes else {}
+            if not pending_nets and slave_nets == target:
+                continue
+            # 수량이 다른 종목만 (items 비교는 C에서 처리)
+            codes = {code for code, _ in target.items() ^ slave_nets.items()}
+            codes.update(pending_nets)
+            for code in codes:
+                base_qty = slave_nets.get(code, 0)
+                qty = target.get(code, 0) - base_qty - pending_nets.get(code, 0)
+                if qty:
+                    orders.append(PlannedOrder(
+                        account=slave,
+                        code=code,
+                        direction=BnsTpCode.LONG if qty > 0 else BnsTpCode.SHORT,
+                        qty=abs(qty),
+                        base_qty=base_qty,
+                    ))
+        return orders
@@ -0,0 +1,95 @@
+from dataclasses import dataclass, field
+from enum import IntEnum
+from .Metrics import metrics
+import asyncio, heapq, itertools, time
+
+
+class RequestPriority(IntEnum):
+    """
+    계좌 하나 안에서 TR 요청 우선순위 (작을수록 먼저)
+    """
+    EMERGENCY = 0  # 긴급 청산
+    ORDER = 1      # 카피 주문
+    CONFIRM = 2    # 주문 체결 확인, master 잔고 조회 (변화 감지)
+    RECONCILE = 3  # slave 주기 잔고 조회 (계좌가 바쁘면 이번 주기는 건너뜀)
+
+
+@dataclass
+class AccountQueue:
+    in_flight: int = 0
+    waiters: list[tuple[int, int, asyncio.Future]] = field(default_factory=list)  # heap (priority, seq, future)
+
+
+class RequestScheduler:
+    """
+    계좌별 우선순위 요청 슬롯
+    - 슬롯이 비면 대기 중인 요청 중 우선순위가 가장 높은 요청부터 (같은 우선순위는 먼저 온 순서)
+    - CONFIRM, RECONCILE은 동시에 housekeeping 개까지만 -> 주문용 슬롯 order_slots 개는 항상 남음
+    - RECONCILE은 바로 시작할 수 없으면 대기하지 않고 버림 (다음 폴링 주기에 다시 조회)
+    """
+    def __init__(self, order_slots: int = 2, housekeeping: int = 2):
+        capacity = order_slots + housekeeping
+        self.limits = {
+            RequestPriority.EMERGENCY: capacity,
+            RequestPriority.ORDER: capacity,
+            RequestPriority.CONFIRM: housekeeping,
+            RequestPriority.RECONCILE: 1,
+        }
+        self.queues: dict[str, AccountQueue] = {}
+        self.seq = itertools.count()
+
+    def get_queue(self, account: str) -> AccountQueue:
+        queue = self.queues.get(account)
+        if queue is None:
+            queue = self.queues[account] = AccountQueue()
+        return queue
+
+    def prune(self, queue: AccountQueue) -> None:
+        while queue.waiters and queue.waiters[0][2].cancelled():
+            heapq.heappop(queue.waiters)
+
+    def can_start(self, queue: AccountQueue, priority: RequestPriority) -> bool:
+        if queue.in_flight >= self.limits[priority]:
+            return False
+        self.prune(queue)
+        # 같거나 높은 우선순위가 기다리고 있으면 새치기하지 않음
+        return not queue.waiters or queue.waiters[0][0] > priority
+
+    async def acquire(self, account: str, priority: RequestPriority) -> bool:
+        """
+        returns: 슬롯을 얻었으면 True (끝나면 release 호출), 버려졌으면 False
+        """
+        queue = self.get_queue(account)
+        if self.can_start(queue, priority):
+            queue.in_flight += 1
+            metrics.request_queue_seconds.observe(0.0, account, priority.name)
+            return True
+        if priority >= RequestPriority.RECONCILE:
+            metrics.requests_dropped_total.inc(account, priority.name)
+            return False
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(queue.waiters, (priority, next(self.seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(account)  # 슬롯을 넘겨받은 직후 취소
+            raise
+        metrics.request_queue_seconds.observe(time.monotonic() - start, account, priority.name)
+        return True
+
+    def release(self, account: str) -> None:
+        queue = self.get_queue(account)
+        queue.in_flight -= 1
+        self.prune(queue)
+        while queue.waiters:
+            priority, _, future = queue.waiters[0]
+            # 맨 앞 (가장 높은 우선순위)이 시작할 수 없으면 뒤에 있는 요청도 시작할 수 없음
+            if queue.in_flight >= self.limits[priority]:
+                break
+            heapq.heappop(queue.waiters)
+            queue.in_flight += 1
+            future.set_result(True)
+            self.prune(queue)
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from .types import *
+import aiohttp, asyncio, random
+
+
+@dataclass(frozen=True)
+class RetryRule:
+    """
+    TR 하나의 재시도 규칙
+    """
+    max_attempts: int   # 최초 요청 포함
+    base_delay: float   # 첫 재시도 대기 상한 (초), 재시도마다 2배
+    max_delay: float
+    budget: float       # deadline을 지정하지 않았을 때 최초 요청부터 재시도를 포기할 때까지 (초)
+    idempotent: bool    # True: 조회 (그대로 재시도), False: 주문 (전송되지 않은 것을 확인한 뒤에만 재시도)
+
+
+class RetryPolicy:
+    """
+    일시적 에러 (SERVICE_DELAY, 연결 끊김, timeout) 재시도
+    - full jitter exponential backoff: 대기 = uniform(0, min(max_delay, base_delay * 2^attempt))
+      여러 계좌가 같은 순간 다시 요청해서 또 지연되는 것을 막음
+    - deadline (tick 예산)을 넘길 재시도는 하지 않음 -> 다음 tick이 처리
+    """
+    QUERY = RetryRule(max_attempts=3, base_delay=0.05, max_delay=0.5, budget=1.0, idempotent=True)
+    ORDER = RetryRule(max_attempts=3, base_delay=0.05, max_delay=0.5, budget=3.0, idempotent=False)
+
+    def __init__(self, seed: int | None = None):
+        self.rng = random.Random(seed)
+        self.rules: dict[str, RetryRule] = {
+            "CIDBQ01500": self.QUERY,  # 해외선물 미결제잔고내역 조회
+            "CIDBQ01800": self.QUERY,  # 해외선물 주문체결내역 조회
+            "CIDBT00100": self.ORDER,  # 해외선물 신규주문
+            "CIDBT01000": self.ORDER,  # 해외선물 취소주문
+        }
+
+    def get_rule(self, tr_cd: str) -> RetryRule:
+        return self.rules.get(tr_cd, self.ORDER)  # 모르는 TR은 재시도하지 않는 쪽으로
+
+    def is_transient(self, error) -> bool:
+        """
+        error: api.last_message (응답 JSON, 메세지, 예외)
+        """
+        if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, ConnectionError)):
+            return True
+        return ErrorMsg.SERVICE_DELAY in str(error)
+
+    def backoff(self, rule: RetryRule, attempt: int) -> float:
+        """
+        attempt: 0부터 (첫 재시도)
+        """
+        return self.rng.uniform(0.0, min(rule.max_delay, rule.base_delay * 2 ** attempt))
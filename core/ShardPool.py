@@ -0,0 +1,401 @@
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from .LogManager import logManager
+from .AccountRegistry import Account
+from .PositionBook import PositionBook
+from .EventBroker import eventBroker
+from .schemas import *
+from .types import *
+from dhooks import Embed
+import asyncio, math, multiprocessing, orjson, time
+
+
+@dataclass
+class Shard:
+    """
+    slave 계좌 일부를 담당하는 worker 프로세스 하나
+    """
+    id: int
+    names: list[str]  # 담당 slave 계좌 이름
+    process: multiprocessing.Process | None = None
+    conn: Connection | None = None
+    reader_task: asyncio.Task | None = None
+    params_seq: int = 0  # shard가 마지막으로 반영한 params 번호
+    metrics: dict[str, list] = field(default_factory=dict)  # 마지막으로 받은 Metrics.dump()
+
+
+class ShardPool:
+    """
+    slave 계좌를 여러 프로세스에 나눠서 카피 (계좌가 많을 때 JSON 파싱, 주문 계산을 여러 코어에서 처리)
+    - coordinator (leader worker)는 master만 조회하고, master snapshot을 한번 직렬화해서 모든 shard에 pipe로 전송
+    - shard는 담당 slave의 로그인, 잔고 조회, 주문 계획, 주문, 체결 확인을 직접 수행
+    - shard가 보낸 slave 상태는 coordinator의 계좌 (mirror)에 반영 -> get_status, state 저장은 기존과 동일
+    - shard 프로세스가 죽으면 마지막으로 받은 상태로 restart_delay 후 다시 시작
+    """
+    def __init__(self, size: int, restart_delay: float = 5.0):
+        self.size = size
+        self.restart_delay = restart_delay
+        self.shards: list[Shard] = []
+        self.accounts: dict[str, Account] = {}  # coordinator의 slave 계좌 (mirror)
+        self.master_message: bytes = b""        # 마지막으로 보낸 master snapshot
+        self.params: tuple | None = None        # 마지막으로 보낸 (pause, slave_multiples)
+        self.params_seq = 0                     # 마지막으로 보낸 params 번호
+        self.params_synced = asyncio.Event()    # 모든 shard가 마지막 params를 반영함
+        self.lease_expires_at: float = math.inf  # 마지막으로 보낸 leader lease 만료 시각
+        self.running = False
+        self.context = multiprocessing.get_context("spawn")  # event loop, thread 상태를 물려받지 않도록
+
+    async def start(self, master: Account, slaves: list[Account], pause: bool, slave_multiples: dict[str, int],
+                    lease_expires_at: float = math.inf) -> None:
+        """
+        slave를 round-robin으로 나눠서 shard 프로세스 시작
+        """
+        self.running = True
+        self.lease_expires_at = lease_expires_at
+        self.accounts = {slave.name: slave for slave in slaves}
+        self.master_message = self.encode_master(master, synced=master.synced_version == master.version)
+        self.params = (pause, dict(slave_multiples))
+        self.params_seq += 1
+        size = max(1, min(self.size, len(slaves)))
+        self.shards = [Shard(i, [slave.name for slave in slaves[i::size]]) for i in range(size)]
+        for shard in self.shards:
+            self.start_shard(shard)
+        logManager.debug(f"copy shards started: {[len(shard.names) for shard in self.shards]} slaves per shard")
+
+    def start_shard(self, shard: Shard) -> None:
+        parent_conn, child_conn = self.context.Pipe()
+        init = orjson.dumps({
+            "shard_id": shard.id,
+            "slaves": [self.encode_account(self.accounts[name]) for name in shard.names],
+            "master": orjson.loads(self.master_message),
+            "params": {"pause": self.params[0], "slave_multiples": self.params[1], "seq": self.params_seq},
+            "lease": self.encode_lease(),
+        })
+        shard.process = self.context.Process(
+            target=run_shard, args=(child_conn, init), name=f"lscopybot-shard-{shard.id}", daemon=True)
+        shard.process.start()
+        child_conn.close()
+        shard.conn = parent_conn
+        shard.reader_task = asyncio.create_task(self.read_shard(shard))
+
+    def encode_account(self, account: Account) -> dict:
+        return {
+            "name": account.name,
+            "app_key": account.app_key,
+            "secret_key": account.secret_key,
+            "multiple": account.multiple,
+            "poll_interval": account.poll_interval,
+            "positions": account.positions.nets,
+            "ledger": account.ledger.to_dict(),
+        }
+
+    def encode_master(self, master: Account, synced: bool = False) -> bytes:
+        return orjson.dumps({
+            "type": "master",
+            "version": master.version,
+            "positions": master.positions.nets,
+            "changed_at": master.changed_at,
+            "synced": synced,  # True면 shard에서 카피하지 않음 (재시작 직후 복원한 포지션)
+        })
+
+    def send(self, shard: Shard, data: bytes) -> None:
+        try:
+            shard.conn.send_bytes(data)
+        except (OSError, ValueError):
+            pass  # 종료된 shard는 read_shard에서 다시 시작
+
+    def broadcast_master(self, master: Account) -> None:
+        """
+        master snapshot을 한번만 직렬화해서 모든 shard에 전송
+        """
+        self.master_message = self.encode_master(master)
+        for shard in self.shards:
+            self.send(shard, self.master_message)
+
+    def sync_params(self, pause: bool, slave_multiples: dict[str, int]) -> None:
+        """
+        pause, 배수가 바뀌었을 때만 전송 (shard가 반영했는지는 wait_params로 확인)
+        """
+        params = (pause, dict(slave_multiples))
+        if params == self.params:
+            return
+        self.params = params
+        self.params_seq += 1
+        self.params_synced.clear()
+        data = orjson.dumps({"type": "params", "pause": pause, "slave_multiples": params[1], "seq": self.params_seq})
+        for shard in self.shards:
+            self.send(shard, data)
+
+    async def wait_params(self, timeout: float = 2.0) -> bool:
+        """
+        마지막으로 보낸 params를 모든 shard가 반영할 때까지 대기 (pause 후 shard가 더 이상 주문하지 않도록)
+        returns: timeout 전에 모두 반영했는지 (죽은 shard는 다시 시작할 때 최신 params로 시작)
+        """
+        if all(shard.params_seq == self.params_seq for shard in self.shards):
+            return True
+        try:
+            await asyncio.wait_for(self.params_synced.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def encode_lease(self) -> dict:
+        # JSON에는 inf가 없으므로 lease를 쓰지 않으면 None
+        return {"type": "lease", "expires_at": self.lease_expires_at if math.isfinite(self.lease_expires_at) else None}
+
+    def sync_lease(self, expires_at: float) -> None:
+        """
+        lease 만료 시각 전송 (shard도 주문 직전에 확인해서 lease를 잃은 뒤에는 주문하지 않음)
+        """
+        self.lease_expires_at = expires_at
+        data = orjson.dumps(self.encode_lease())
+        for shard in self.shards:
+            self.send(shard, data)
+
+    def shard_metrics(self) -> list[dict[str, list]]:
+        return [shard.metrics for shard in self.shards if shard.metrics]
+
+    async def read_shard(self, shard: Shard) -> None:
+        """
+        shard에서 오는 계좌 상태, 주문 이벤트, 지표 반영
+        pipe가 끊기면 (프로세스 종료) 다시 시작
+        """
+        conn = shard.conn
+        while True:
+            try:
+                data = await asyncio.to_thread(conn.recv_bytes)
+            except (EOFError, OSError):
+                break
+            self.on_message(shard, orjson.loads(data))
+        conn.close()
+        await asyncio.to_thread(shard.process.join, 5.0)
+        if not self.running:
+            return
+
+        await logManager.log_error_message_async(
+            f"copy shard {shard.id} exited (exitcode {shard.process.exitcode}), restarting in {self.restart_delay}s", "Shard Error")
+        for name in shard.names:
+            self.accounts[name].connected = False
+        await asyncio.sleep(self.restart_delay)
+        if self.running:
+            self.start_shard(shard)
+
+    def on_message(self, shard: Shard, message: dict) -> None:
+        if message["type"] == "accounts":
+            for state in message["accounts"]:
+                account = self.accounts[state["name"]]
+                account.connected = state["connected"]
+                account.positions = PositionBook(state["positions"])
+                account.version = state["version"]
+                account.ledger.load(state["ledger"])
+        elif message["type"] == "event":
+            eventBroker.publish(message["event"], message["data"])
+        elif message["type"] == "metrics":
+            shard.metrics = message["metrics"]
+        elif message["type"] == "notify":
+            # shard의 Discord 알림은 coordinator 웹훅 대기열 하나로 전송 (rate limit 공유)
+            embed = decode_embed(message["embed"]) if message["embed"] else None
+            if not logManager.enqueue_message(message["message"], embed):
+                logManager.info(message["message"] or f"{embed.title}\n{embed.description}")
+        elif message["type"] == "params_ack":
+            shard.params_seq = message["seq"]
+            if all(shard.params_seq == self.params_seq for shard in self.shards):
+                self.params_synced.set()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        shard에 종료 요청 -> 마지막 상태를 받은 뒤 종료, timeout이 지나면 강제 종료
+        """
+        self.running = False
+        data = orjson.dumps({"type": "stop"})
+        for shard in self.shards:
+            self.send(shard, data)
+        tasks = [shard.reader_task for shard in self.shards if shard.reader_task]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        for shard in self.shards:
+            if shard.process.is_alive():
+                shard.process.terminate()
+            if shard.reader_task and not shard.reader_task.done():
+                shard.reader_task.cancel()
+
+
+def decode_embed(data: dict) -> Embed:
+    """
+    Embed.to_dict() 결과로 다시 Embed 생성
+    """
+    embed = Embed(title=data.get("title"), description=data.get("description"), color=data.get("color"), url=data.get("url"))
+    for field in data.get("fields", []):
+        embed.add_field(name=field["name"], value=field["value"], inline=field.get("inline", True))
+    return embed
+
+
+##############################
+# shard 프로세스
+##############################
+class ShardNotifier:
+    """
+    shard 프로세스의 웹훅 대기열 (logManager.notification_queue) 대신 사용
+    알림을 pipe로 coordinator에 보내서 coordinator의 NotificationQueue에서 전송
+    """
+    running = True
+
+    def __init__(self, engine: "ShardEngine"):
+        self.engine = engine
+
+    def put(self, message: str | None = None, embed: Embed | None = None) -> bool:
+        self.engine.send({"type": "notify", "message": message, "embed": embed.to_dict() if embed else None})
+        return True
+
+    async def close(self) -> None:
+        pass
+
+
+class ShardEngine:
+    """
+    shard 프로세스 안에서 담당 slave만 카피
+    master는 조회하지 않고 coordinator가 보낸 snapshot을 그대로 사용
+    """
+    def __init__(self, conn: Connection):
+        from .ExchangeManager import exchangeManager
+        from .Metrics import metrics
+        self.conn = conn
+        self.exchange_manager = exchangeManager
+        self.metrics = metrics
+        self.stopping = asyncio.Event()
+        self.reported: dict[str, tuple] = {}  # {계좌 이름: 마지막으로 보낸 (version, connected, ledger)}
+        self.metrics_interval = 1.0
+        self.metrics_sent_at = 0.0
+
+    def send(self, message: dict) -> None:
+        try:
+            self.conn.send_bytes(orjson.dumps(message))
+        except (OSError, ValueError):
+            self.stopping.set()  # coordinator 종료
+
+    async def run(self, init: dict) -> None:
+        em = self.exchange_manager
+        logManager.notification_queue = ShardNotifier(self)  # 주문 결과, 조회 에러 알림
+        em.accounts.master = Account("MASTER", APIType.MASTER, api=em.accounts.create_api())
+        em.accounts.slaves = []
+        for config in init["slaves"]:
+            slave = Account(
+                name=config["name"],
+                type=APIType.SLAVE,
+                app_key=config["app_key"],
+                secret_key=config["secret_key"],
+                multiple=config["multiple"],
+                poll_interval=config["poll_interval"],
+                api=em.accounts.create_api(),
+            )
+            em.accounts.add_slave(slave)
+            em.restore_account_positions(slave, PositionBook(config["positions"]))
+            slave.ledger.load(config["ledger"])
+        self.on_message(init["master"])
+        self.on_message({"type": "params", **init["params"]})
+        self.on_message(init["lease"])
+
+        # login (담당 slave만)
+        await asyncio.gather(*(em.login(slave) for slave in em.slaves))
+        for slave in em.slaves:
+            slave.connected = slave.api._connected
+        self.report()
+
+        reader_task = asyncio.create_task(self.read_messages())
+        session_task = asyncio.create_task(em.run_session_refresh())
+        event_task = asyncio.create_task(self.forward_events())
+        try:
+            await self.copy_loop()
+        finally:
+            for task in (reader_task, session_task, event_task):
+                task.cancel()
+            self.report(force_metrics=True)
+            await em.close()
+
+    async def copy_loop(self) -> None:
+        em = self.exchange_manager
+        while not self.stopping.is_set():
+            delay = em.next_deadline() - time.monotonic()
+            if delay > 0 and em.master.version == em.master.synced_version:
+                await em.poll_scheduler.wait(delay)
+                continue
+            with logManager.tick_context():
+                await em.on_timer_update()
+            self.report()
+
+    async def read_messages(self) -> None:
+        while True:
+            try:
+                data = await asyncio.to_thread(self.conn.recv_bytes)
+            except (EOFError, OSError):
+                break  # coordinator 종료
+            if self.on_message(orjson.loads(data)):
+                break
+        self.stopping.set()
+        self.exchange_manager.poll_scheduler.wakeup.set()
+
+    def on_message(self, message: dict) -> bool:
+        """
+        returns: 종료 요청 여부
+        """
+        em = self.exchange_manager
+        if message["type"] == "master":
+            master = em.master
+            if message["version"] != master.version:
+                master.positions = PositionBook(message["positions"])
+                master.version = message["version"]
+                master.changed_at = message["changed_at"]
+            if message["synced"]:
+                master.synced_version = master.version
+            em.poll_scheduler.wakeup.set()
+        elif message["type"] == "params":
+            betting_params.slave_multiples = dict(message["slave_multiples"])
+            em.set_pause(message["pause"])  # 진행 중인 카피도 다음 주문부터 보내지 않음
+            self.send({"type": "params_ack", "seq": message["seq"]})
+        elif message["type"] == "lease":
+            em.lease_expires_at = math.inf if message["expires_at"] is None else message["expires_at"]
+        elif message["type"] == "stop":
+            return True
+        return False
+
+    async def forward_events(self) -> None:
+        """
+        주문 이벤트 (dashboard)를 coordinator로 전달
+        """
+        queue = eventBroker.subscribe()
+        while True:
+            event = await queue.get()
+            self.send({"type": "event", "event": event.type, "data": orjson.loads(event.data)})
+
+    def report(self, force_metrics: bool = False) -> None:
+        """
+        바뀐 계좌 상태만 전송, 지표는 metrics_interval 마다
+        """
+        accounts = []
+        for slave in self.exchange_manager.slaves:
+            ledger = slave.ledger.to_dict()
+            key = (slave.version, slave.connected, ledger)
+            if self.reported.get(slave.name) == key:
+                continue
+            self.reported[slave.name] = key
+            accounts.append({
+                "name": slave.name,
+                "connected": slave.connected,
+                "positions": slave.positions.nets,
+                "version": slave.version,
+                "ledger": ledger,
+            })
+        if accounts:
+            self.send({"type": "accounts", "accounts": accounts})
+
+        now = time.monotonic()
+        if force_metrics or now - self.metrics_sent_at >= self.metrics_interval:
+            self.metrics_sent_at = now
+            self.send({"type": "metrics", "metrics": self.metrics.dump()})
+
+
+def run_shard(conn: Connection, init: bytes) -> None:
+    """
+    shard 프로세스 진입점 (spawn)
+    """
+    asyncio.run(ShardEngine(conn).run(orjson.loads(init)))
@@ -0,0 +1,107 @@
+from typing import Any, TYPE_CHECKING
+import asyncio, orjson, os, threading, time
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+class StateStore:
+    """
+    SQLite (WAL) key-value 상태 저장소
+    - put은 메모리에 모아두기만 하고, flush_interval 마다 한 transaction으로 기록 (commit/fsync 횟수 최소화)
+    - 마지막으로 기록한 값과 같으면 다시 쓰지 않음
+    - 값은 JSON (orjson)
+    - worker 여러개가 같은 파일을 공유 (다른 프로세스가 쓴 값은 read로 직접 조회)
+    """
+    def __init__(self, path: str, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.conn: "sqlite3.Connection | None" = None
+        self.dirty: dict[str, bytes] = {}    # 기록 대기
+        self.written: dict[str, bytes] = {}  # 마지막으로 기록한 값
+        self.lock = threading.Lock()         # flush (event loop)와 run (worker thread)이 동시에 쓰지 않도록
+
+    def open(self) -> None:
+        if self.conn is not None:
+            return
+        import sqlite3  # main import 시간에서 제외 (open은 startup에서 호출)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # WAL에서는 checkpoint 때만 fsync
+        self.conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value BLOB NOT NULL, updated_at REAL NOT NULL)")
+        self.conn.commit()
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        다른 프로세스가 쓴 값까지 포함해서 캐시를 다시 읽음
+        """
+        with self.lock:
+            self.written = {key: value for key, value in self.conn.execute("SELECT key, value FROM state")}
+
+    def read(self, key: str) -> Any | None:
+        """
+        캐시를 거치지 않고 DB에서 직접 조회 (다른 worker가 쓴 값)
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def write_now(self, key: str, value: Any) -> None:
+        """
+        캐시 비교 없이 바로 기록 (worker끼리 공유하는 설정 값)
+        """
+        self.dirty.pop(key, None)
+        self.write({key: orjson.dumps(value)})
+
+    def get(self, key: str) -> Any | None:
+        data = self.dirty.get(key) or self.written.get(key)
+        return orjson.loads(data) if data is not None else None
+
+    def put(self, key: str, value: Any) -> None:
+        data = orjson.dumps(value)
+        if self.written.get(key) == data:
+            self.dirty.pop(key, None)
+            return
+        self.dirty[key] = data
+
+    def take_dirty(self) -> dict[str, bytes]:
+        batch, self.dirty = self.dirty, {}
+        return batch
+
+    def write(self, batch: dict[str, bytes]) -> None:
+        if not batch:
+            return
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(key, value, now) for key, value in batch.items()],
+            )
+        self.written.update(batch)
+
+    def flush(self) -> None:
+        """
+        대기 중인 값을 바로 기록 (동기)
+        """
+        if self.conn is not None:
+            self.write(self.take_dirty())
+
+    async def run(self) -> None:
+        """
+        flush_interval 마다 모아둔 값을 별도 스레드에서 기록
+        """
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            batch = self.take_dirty()
+            if batch:
+                await asyncio.to_thread(self.write, batch)
+
+    def close(self) -> None:
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+import orjson, time
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    """
+    한 시점의 상태 (변경 불가)
+    body는 미리 직렬화한 JSON이라 요청마다 다시 직렬화하지 않음
+    """
+    version: int
+    etag: str
+    body: bytes
+    created_at: float  # time.time()
+
+
+class StatusPublisher:
+    """
+    copy loop가 tick마다 publish, /view_status는 마지막 snapshot을 그대로 응답
+    - key가 이전 publish와 같으면 상태를 다시 만들지 않음
+    - 내용이 바뀔 때만 version 증가
+    """
+    def __init__(self, build: Callable[[], dict]):
+        self.build = build
+        self.boot_id = f"{int(time.time()):x}"  # 재시작 후 이전 ETag와 겹치지 않도록
+        self.last_key: Hashable | None = None
+        self.snapshot = StatusSnapshot(0, self.make_etag(0), b"{}", time.time())
+
+    def make_etag(self, version: int) -> str:
+        return f'"{self.boot_id}-{version}"'
+
+    def publish(self, key: Hashable | None = None) -> StatusSnapshot:
+        """
+        key: 상태가 바뀌었는지 싸게 판단할 수 있는 값 (계좌별 version 등), None이면 항상 다시 만듦
+        """
+        if key is not None and key == self.last_key:
+            return self.snapshot
+        self.last_key = key
+
+        status: dict[str, Any] = self.build()
+        body = orjson.dumps(status)
+        if body == self.snapshot.body:
+            return self.snapshot
+        version = self.snapshot.version + 1
+        self.snapshot = StatusSnapshot(version, self.make_etag(version), body, time.time())
+        return self.snapshot
@@ -1,3 +1,5 @@
 from .schemas import *
 from .LogManager import logManager
-from .Core import core
\ No newline at end of file
+from .Core import core
+from .Metrics import metrics
+from .EventBroker import eventBroker
@@ -1,11 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Literal
 
 
 @dataclass
 class BettingParams:
-    slave1_multiple: int = 1
-    slave2_multiple: int = 1
+    slave_multiples: dict[str, int] = field(default_factory=dict)  # {슬레이브 이름: 배수}
 
 # singleton
 betting_params: BettingParams = BettingParams()
\ No newline at end of file
@@ -7,14 +7,14 @@ class APIType(str, Enum):
     API 구분
     """
     MASTER = 'MASTER'   # 마스터 API
-    SLAVE1 = 'SLAVE1'   # 슬레이브1 API
-    SLAVE2 = 'SLAVE2'   # 슬레이브2 API
+    SLAVE = 'SLAVE'     # 슬레이브 API
 
 class ErrorMsg(str, Enum):
     EXPIRED_TOKEN = '기간이 만료된 token'
     INVALID_TOKEN = '유효하지 않은 token'
     SERVICE_DELAY = '서비스가 지연'
     NOT_ENOUGH_BALANCE = '주문가능금액을 초과'
+    REQUEST_DEFERRED = '계좌 요청이 많아 다음 주기로 연기'  # RequestScheduler가 버린 요청 (LS 응답 아님)
 
 # ------------------------------ LS 증권 API 코드 정의 ------------------------------ #
 class AcntTpCode(str, Enum):
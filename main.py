@@ -1,9 +1,9 @@
 from fastapi.exception_handlers import request_validation_exception_handler
-from fastapi import FastAPI, Request, status, BackgroundTasks, Query
-from fastapi.responses import ORJSONResponse, RedirectResponse
+from fastapi import FastAPI, Request, status, BackgroundTasks, Query, Header
+from fastapi.responses import ORJSONResponse, RedirectResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
-import traceback, ipaddress, asyncio, os, json, httpx
+import traceback, ipaddress, asyncio, hmac, os, json
 from contextlib import asynccontextmanager
 
 from settings import settings
@@ -16,7 +16,11 @@ async def lifespan(app: FastAPI):
     # Startup
     logManager.initialize()
     await core.initialize()
-    await logManager.log_message_async(f"LS Copy Bot 실행 완료! - 버전: {VERSION}")
+    if core.engine_running:
+        await logManager.log_message_async(f"LS Copy Bot 실행 완료! - 버전: {VERSION}")
+    else:
+        # uvicorn worker가 여러개면 leader만 Discord로 알림 (나머지는 leader가 되면 lease 획득 알림)
+        logManager.info(f"LS Copy Bot follower worker 실행 완료 - 버전: {VERSION}")
     
     yield
     
@@ -25,6 +29,7 @@ async def lifespan(app: FastAPI):
         await core.on_shutdown()
     except Exception as e:
         logManager.log_error_message(f"Shutdown error: {e}", "Shutdown Error")
+    await logManager.close()
 
 
 # global instance
@@ -75,6 +80,10 @@ async def whitelist_middleware(request: Request, call_next):
 @app.middleware("http")
 async def no_cache_middleware(request: Request, call_next):
     response = await call_next(request)
+    if "ETag" in response.headers:
+        # ETag 응답은 저장은 허용하고 매번 재검증 (If-None-Match -> 304로 저장된 body 재사용)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
     response.headers["Pragma"] = "no-cache"
     response.headers["Expires"] = "0"
@@ -108,16 +117,71 @@ async def set_betting_params(request: BettingParamsRequest):
 ##########################################
 # monitoring
 ##########################################
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
 @app.post("/view_status")
-async def view_status(request: BaseRequest):
-    result = core.get_status()
-    return result
+async def view_status(request: BaseRequest, if_none_match: str | None = Header(None)):
+    """ 마지막 tick에 만든 status snapshot 응답 (바뀐게 없으면 304) """
+    snapshot = core.status_publisher.snapshot
+    headers = {"ETag": snapshot.etag}
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+@app.post("/events/token")
+async def events_token(request: BaseRequest):
+    """ /events 구독용 쿠키 발급 (password가 URL, access log에 남지 않도록) """
+    response = ORJSONResponse({"expires_in": EVENTS_TOKEN_TTL})
+    response.set_cookie(
+        EVENTS_COOKIE, issue_events_token(), max_age=EVENTS_TOKEN_TTL,
+        path="/events", httponly=True, samesite="strict",
+    )
+    return response
+
+@app.get("/events")
+async def events(request: Request):
+    """ Server-Sent Events: status (포지션, 연결 상태), order (slave 주문 결과) """
+    if not check_events_token(request.cookies.get(EVENTS_COOKIE)):
+        return ORJSONResponse(status_code=status.HTTP_401_UNAUTHORIZED, content="invalid token")
+
+    queue = eventBroker.subscribe()
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), 15)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"  # 프록시가 연결을 끊지 않도록 keep-alive
+                    continue
+                yield event.encode()
+        finally:
+            eventBroker.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"X-Accel-Buffering": "no"})
 
 @app.post("/view_params")
 async def view_params(request: BaseRequest):
     result = core.get_params()
     return result
 
+def check_bearer_token(authorization: str | None, token: str | None) -> bool:
+    if not authorization or not token:
+        return False
+    scheme, _, credentials = authorization.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(credentials.strip().encode(), token.encode())
+
+@app.get("/metrics")
+async def get_metrics(authorization: str | None = Header(None)):
+    """ Prometheus text format (계좌 이름, 주문 수가 들어있어서 token 필요) """
+    if not check_bearer_token(authorization, settings.METRICS_TOKEN or settings.PASSWORD):
+        return PlainTextResponse("invalid token", status_code=status.HTTP_401_UNAUTHORIZED, headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(core.get_metrics(), media_type="text/plain; version=0.0.4")
+
 
 ##########################################
 # utility
@@ -134,12 +198,12 @@ async def use_whitelist(use: str):
 ##########################################
 @app.post("/pause")
 async def pause(request: BaseRequest):
-    core.set_pause(True)
+    await core.set_pause(True)
     return f"Paused"
 
 @app.post("/resume")
 async def resume(request: BaseRequest):
-    core.set_pause(False)
+    await core.set_pause(False)
     return f"Resumed"
 
 
@@ -2,6 +2,7 @@ from pydantic import BaseModel, validator, root_validator
 from settings import settings
 from utility import LOGGER_LEVEL_LITERAL, LOGGER_LEVELS
 from typing import Literal
+import hashlib, hmac, time
 from core import BettingParams
 
 ############################################
@@ -13,6 +14,29 @@ def check_password(password: str) -> bool:
     else:
         return False
     
+# /events (SSE) 인증: EventSource는 헤더를 보낼 수 없어서 password 대신 서명한 쿠키 사용
+EVENTS_COOKIE = "lscopybot_events"
+EVENTS_TOKEN_TTL = 12 * 60 * 60  # 초
+
+def sign_events_token(expires_at: int) -> str:
+    key = (settings.PASSWORD or "").encode()
+    return hmac.new(key, f"events:{expires_at}".encode(), hashlib.sha256).hexdigest()
+
+def issue_events_token(ttl: int = EVENTS_TOKEN_TTL) -> str:
+    """
+    returns: "<만료 시각>.<서명>" (서버에 저장하지 않으므로 어느 worker에서든 확인 가능, PASSWORD가 바뀌면 무효)
+    """
+    expires_at = int(time.time()) + ttl
+    return f"{expires_at}.{sign_events_token(expires_at)}"
+
+def check_events_token(token: str | None) -> bool:
+    if not token or not settings.PASSWORD:
+        return False
+    expires_at, _, signature = token.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(signature, sign_events_token(int(expires_at)))
+    
 class BaseRequest(BaseModel):
     password: str
 
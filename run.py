@@ -4,13 +4,16 @@ from settings import settings
 from main import app
 import platform, asyncio
 
-def start_server(host="0.0.0.0", port=8000 if settings.PORT is None else settings.PORT):
+def start_server(host="0.0.0.0", port=8000 if settings.PORT is None else settings.PORT, workers=1):
+    """
+    workers: uvicorn worker 프로세스 수 (copy engine은 leader worker 하나에서만 실행)
+    """
     # Windows 환경에서 SelectorEventLoop 설정
     if platform.system() == "Windows":
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
     app.state.port = port
-    uvicorn.run("main:app", host=host, port=port, reload=False, limit_concurrency=1000)
+    uvicorn.run("main:app", host=host, port=port, reload=False, limit_concurrency=1000, workers=workers)
 
 
 if __name__ == "__main__":
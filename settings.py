@@ -12,6 +12,8 @@ class WebSettings(BaseSettings):
     WHITELIST: list[str] | None = None
     USE_WHITELIST: bool | None = None
     PASSWORD: str | None = None
+    # /metrics 요청 헤더 Authorization: Bearer <값> (없으면 PASSWORD)
+    METRICS_TOKEN: str | None = None
 
 @dataclass
 class ExchangeSettings(BaseSettings):
@@ -21,6 +23,35 @@ class ExchangeSettings(BaseSettings):
     SLAVE1_SECRET_KEY : str | None = None
     SLAVE2_APP_KEY : str | None = None
     SLAVE2_SECRET_KEY : str | None = None
+    # 슬레이브 계좌 목록 (JSON) 예) [{"name": "SLAVE3", "app_key": "...", "secret_key": "...", "multiple": 1, "poll_interval": 5}, ...]
+    SLAVE_ACCOUNTS : list[dict] | None = None
+    # master 실시간 체결 수신 (사용하면 잔고 조회는 RECONCILE_INTERVAL 초마다)
+    USE_FILL_STREAM : bool | None = None
+    FILL_STREAM_URL : str | None = None
+    RECONCILE_INTERVAL : float | None = None
+    # 폴링 주기 (초)
+    MASTER_POLL_INTERVAL : float | None = None  # master 잔고 조회 주기
+    SLAVE_POLL_INTERVAL : float | None = None   # slave 잔고 조회 주기 (SLAVE_ACCOUNTS의 poll_interval이 우선)
+    BURST_POLL_INTERVAL : float | None = None   # master 변화 감지 후 burst 동안 master 조회 주기
+    BURST_DURATION : float | None = None
+    DOUBLE_CHECK_DELAY : float | None = None    # master 변화 후 재카피까지 대기 시간
+    # slave 계좌를 나눠서 처리할 프로세스 수 (slave가 많을 때, 0 또는 없으면 한 프로세스에서 처리)
+    COPY_SHARDS : int | None = None
+    # 계좌 x TR 초당 요청 수 제한 (JSON), 없으면 RateLimiter 기본값 예) [{"tr_cd": "CIDBQ01500", "per_second": 2}, ...]
+    TR_RATE_LIMITS : list[dict] | None = None
+    # 계좌별 동시 주문 수
+    ORDER_CONCURRENCY : int | None = None
+    # 주문 후 잔고에서 확인될 때까지 기다리는 시간 (초), 지나면 잔고를 그대로 믿음
+    PENDING_ORDER_TIMEOUT : float | None = None
+    # 토큰 유효시간 (초), 만료 TOKEN_REFRESH_MARGIN 초 전에 백그라운드에서 재발급
+    TOKEN_TTL : float | None = None
+    TOKEN_REFRESH_MARGIN : float | None = None
+    # uvicorn worker 여러개일 때 copy engine을 실행하는 leader의 lease 시간 (초), leader가 죽으면 이 시간 안에 다른 worker가 이어받음
+    LEADER_LEASE_TTL : float | None = None
+    # 파일 로그를 JSON lines (log/lscopybot.<날짜>.jsonl)로 기록, tick 필드로 같은 tick의 로그끼리 묶음
+    LOG_JSON : bool | None = None
+    # 실계좌 대신 simulator.SimulatedOpenApi 사용
+    USE_SIMULATOR : bool | None = None
 
 @dataclass
 class TotalSettings(ExchangeSettings, DiscordSettings, WebSettings):
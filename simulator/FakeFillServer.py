@@ -0,0 +1,106 @@
+"""
+LS 실시간 WebSocket 대체 서버 (로컬 테스트용)
+계좌등록 메세지를 받으면 응답하고, emit_fill 호출 시 TC3(해외선물 주문체결) 이벤트 전송
+
+실행: python -m simulator.FakeFillServer --port 9443 --interval 5
+설정: FILL_STREAM_URL="ws://127.0.0.1:9443/websocket", USE_FILL_STREAM="1"
+"""
+from aiohttp import web
+import aiohttp, asyncio, fire, json, time
+
+
+class FakeFillServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 9443):
+        self.host = host
+        self.port = port
+        self.clients: set[web.WebSocketResponse] = set()
+        self.subscriptions: dict[web.WebSocketResponse, set[str]] = {}
+        self.runner: web.AppRunner | None = None
+        self.order_no = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/websocket"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/websocket", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    async def stop(self) -> None:
+        for websocket in list(self.clients):
+            await websocket.close()
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    async def handle(self, request: web.Request) -> web.WebSocketResponse:
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.clients.add(websocket)
+        self.subscriptions[websocket] = set()
+        try:
+            async for msg in websocket:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                header, body = data.get("header", {}), data.get("body", {})
+                tr_cd, tr_type = body.get("tr_cd"), header.get("tr_type")
+                if tr_type == "1":
+                    self.subscriptions[websocket].add(tr_cd)
+                elif tr_type == "2":
+                    self.subscriptions[websocket].discard(tr_cd)
+                await websocket.send_str(json.dumps({
+                    "header": {"tr_cd": tr_cd, "tr_type": tr_type, "rsp_cd": "00000", "rsp_msg": "정상처리되었습니다"},
+                    "body": None,
+                }))
+        finally:
+            self.clients.discard(websocket)
+            self.subscriptions.pop(websocket, None)
+        return websocket
+
+    async def emit_fill(self, code: str = "MNQH26", direction: str = "2", qty: int = 1, price: float = 0.0) -> int:
+        """
+        TC3 구독 중인 모든 클라이언트에 체결 이벤트 전송
+        returns: 전송한 클라이언트 수
+        """
+        self.order_no += 1
+        message = json.dumps({
+            "header": {"tr_cd": "TC3", "tr_key": ""},
+            "body": {
+                "ordr_dt": time.strftime("%Y%m%d"),
+                "ordr_no": f"{self.order_no:010d}",
+                "is_cd": code,
+                "s_b_ccd": direction,
+                "ccls_q": str(qty),
+                "ccls_prc": str(price),
+                "ccls_tm": time.strftime("%H%M%S"),
+            },
+        })
+        sent = 0
+        for websocket, tr_codes in list(self.subscriptions.items()):
+            if "TC3" in tr_codes and not websocket.closed:
+                await websocket.send_str(message)
+                sent += 1
+        return sent
+
+
+async def serve(host: str, port: int, interval: float):
+    server = FakeFillServer(host, port)
+    await server.start()
+    print(f"fake fill server: {server.url}")
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            sent = await server.emit_fill()
+            print(f"emit fill #{server.order_no} -> {sent} client(s)")
+    finally:
+        await server.stop()
+
+def start_server(host="127.0.0.1", port=9443, interval=5.0):
+    asyncio.run(serve(host, port, interval))
+
+
+if __name__ == "__main__":
+    fire.Fire(start_server)
@@ -0,0 +1,309 @@
+"""
+LS OpenApi 시뮬레이터 (in-process)
+ebest.OpenApi 대신 사용해서 실계좌 없이 카피 로직 테스트, 벤치마크 가능
+
+지원 TR
+- CIDBQ01500: 해외선물 미결제잔고내역 조회
+- CIDBQ01800: 해외선물 주문체결내역 조회 (종목별)
+- CIDBT00100: 해외선물 신규주문 (시장가, fill_delay 후 잔고 반영)
+- CIDBT01000: 해외선물 취소주문 (아직 체결 안 된 주문만)
+
+사용 예)
+    exchange = SimulatedExchange()
+    exchange.set_latency("CIDBQ01500", LatencyProfile(median=0.05, sigma=0.3))
+    exchange.set_error_rate("CIDBT00100", ErrorMsg.SERVICE_DELAY, 0.01)
+    install(exchangeManager, exchange)   # 또는 설정 USE_SIMULATOR="1"
+    exchange.set_position(exchangeManager.master.app_key, "MNQH26", 2)
+"""
+from dataclasses import dataclass, field
+from ebest import ResponseValue
+from core.types import *
+import asyncio, itertools, json, math, random, time
+
+# 에러 주입 시 응답 메세지 (ErrorMsg가 포함되도록)
+ERROR_RESPONSES = {
+    ErrorMsg.EXPIRED_TOKEN: {'rsp_cd': 'IGW00121', 'rsp_msg': f'{ErrorMsg.EXPIRED_TOKEN.value}입니다.'},
+    ErrorMsg.INVALID_TOKEN: {'rsp_cd': 'IGW00122', 'rsp_msg': f'{ErrorMsg.INVALID_TOKEN.value}입니다.'},
+    ErrorMsg.SERVICE_DELAY: {'rsp_cd': 'IGW00201', 'rsp_msg': f'{ErrorMsg.SERVICE_DELAY.value}되고 있습니다.'},
+    ErrorMsg.NOT_ENOUGH_BALANCE: {'rsp_cd': '01221', 'rsp_msg': f'{ErrorMsg.NOT_ENOUGH_BALANCE.value}하였습니다.'},
+}
+
+
+@dataclass
+class LatencyProfile:
+    """
+    TR 응답 지연 분포 (log-normal)
+    median * exp(sigma * N(0, 1)), 최대 max_latency
+    """
+    median: float = 0.0
+    sigma: float = 0.0
+    max_latency: float = 10.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        return min(self.median * math.exp(self.sigma * rng.gauss(0.0, 1.0)), self.max_latency)
+
+
+@dataclass
+class SimulatedOrder:
+    order_no: str
+    code: str
+    direction: BnsTpCode
+    qty: int
+    fill_at: float          # 체결 시각 (time.monotonic)
+    filled: bool = False
+    cancelled: bool = False
+
+
+@dataclass
+class SimulatedAccount:
+    account_no: str
+    positions: dict[str, int] = field(default_factory=dict)  # {종목코드: net 수량}
+    orders: dict[str, SimulatedOrder] = field(default_factory=dict)
+    pending: list[SimulatedOrder] = field(default_factory=list)  # 아직 체결 안 된 주문
+
+
+class SimulatedExchange:
+    """
+    모든 시뮬레이션 계좌가 공유하는 상태
+    계좌는 app_key 별로 생성
+    """
+    def __init__(self, seed: int | None = None):
+        self.rng = random.Random(seed)
+        self.accounts: dict[str, SimulatedAccount] = {}
+        self.latencies: dict[str, LatencyProfile] = {}
+        self.error_rates: dict[str, dict[ErrorMsg, float]] = {}
+        self.forced_errors: dict[str, list[ErrorMsg]] = {}
+        self.token_ttl: float | None = None  # 토큰 유효시간 (초), None이면 만료 없음
+        self.fill_delay: float = 0.0         # 주문 후 잔고에 반영되기까지 시간 (초)
+        self.request_counts: dict[str, int] = {}
+        self.order_numbers = itertools.count(1)
+        self.account_numbers = itertools.count(1)
+
+    # ------------------------------ 설정 ------------------------------ #
+    def set_latency(self, tr_cd: str, profile: LatencyProfile) -> None:
+        self.latencies[tr_cd] = profile
+
+    def set_error_rate(self, tr_cd: str, error: ErrorMsg, rate: float) -> None:
+        self.error_rates.setdefault(tr_cd, {})[error] = rate
+
+    def inject_error(self, tr_cd: str, error: ErrorMsg, count: int = 1) -> None:
+        """다음 count번의 tr_cd 요청을 error로 실패시킴"""
+        self.forced_errors.setdefault(tr_cd, []).extend([error] * count)
+
+    # ------------------------------ 계좌 ------------------------------ #
+    def get_account(self, app_key: str) -> SimulatedAccount:
+        account = self.accounts.get(app_key)
+        if account is None:
+            account = SimulatedAccount(account_no=f"{next(self.account_numbers):011d}")
+            self.accounts[app_key] = account
+        return account
+
+    def set_position(self, app_key: str, code: str, net_qty: int) -> None:
+        """계좌 포지션 직접 설정 (master 매매 시뮬레이션)"""
+        self.set_position_of(self.get_account(app_key), code, net_qty)
+
+    def settle(self, account: SimulatedAccount) -> None:
+        """fill_at이 지난 주문을 잔고에 반영"""
+        if not account.pending:
+            return
+        now = time.monotonic()
+        pending = []
+        for order in account.pending:
+            if order.cancelled:
+                continue
+            if order.fill_at > now:
+                pending.append(order)
+                continue
+            order.filled = True
+            signed = order.qty if order.direction == BnsTpCode.LONG else -order.qty
+            self.set_position_of(account, order.code, account.positions.get(order.code, 0) + signed)
+        account.pending = pending
+
+    def set_position_of(self, account: SimulatedAccount, code: str, net_qty: int) -> None:
+        if net_qty == 0:
+            account.positions.pop(code, None)
+        else:
+            account.positions[code] = net_qty
+
+    def pick_error(self, tr_cd: str) -> ErrorMsg | None:
+        forced = self.forced_errors.get(tr_cd)
+        if forced:
+            return forced.pop(0)
+        for error, rate in self.error_rates.get(tr_cd, {}).items():
+            if self.rng.random() < rate:
+                return error
+        return None
+
+    # ------------------------------ TR ------------------------------ #
+    def handle(self, app_key: str, tr_cd: str, data: dict) -> dict:
+        account = self.get_account(app_key)
+        self.settle(account)
+        if tr_cd == 'CIDBQ01500':
+            rows = [
+                {
+                    'IsuCodeVal': code,
+                    'CrcyCodeVal': 'USD',
+                    'OvrsDrvtPrdtCode': code[:-3],
+                    'OvrsDrvtOptTpCode': 'F',
+                    'BnsTpCode': BnsTpCode.LONG.value if qty > 0 else BnsTpCode.SHORT.value,
+                    'CmnCodeNm': '매수' if qty > 0 else '매도',
+                    'TpCodeNm': '일반',
+                    'BalQty': abs(qty),
+                    'PchsPrc': '0',
+                }
+                for code, qty in account.positions.items()
+            ]
+            return {'rsp_cd': '00000', 'rsp_msg': '조회가 완료되었습니다.', 'CIDBQ01500OutBlock2': rows}
+
+        if tr_cd == 'CIDBQ01800':
+            code = data['CIDBQ01800InBlock1']['IsuCodeVal']
+            rows = [
+                {
+                    'OvrsFutsOrdNo': order.order_no,
+                    'IsuCodeVal': order.code,
+                    'BnsTpCode': order.direction.value,
+                    'OrdQty': order.qty,
+                    'ExecQty': order.qty if order.filled else 0,
+                    'UnercQty': 0 if order.filled or order.cancelled else order.qty,
+                }
+                for order in reversed(account.orders.values())
+                if not code or order.code == code
+            ]
+            return {'rsp_cd': '00000', 'rsp_msg': '조회가 완료되었습니다.', 'CIDBQ01800OutBlock2': rows}
+
+        if tr_cd == 'CIDBT00100':
+            block = data['CIDBT00100InBlock1']
+            order = SimulatedOrder(
+                order_no=f"{next(self.order_numbers):010d}",
+                code=block['IsuCodeVal'],
+                direction=BnsTpCode(block['BnsTpCode']),
+                qty=int(block['OrdQty']),
+                fill_at=time.monotonic() + self.fill_delay,
+            )
+            account.orders[order.order_no] = order
+            account.pending.append(order)
+            self.settle(account)
+            return {
+                'rsp_cd': '00039',
+                'rsp_msg': '주문이 완료되었습니다.',
+                'CIDBT00100OutBlock2': {'AcntNo': account.account_no, 'OvrsFutsOrdNo': order.order_no},
+            }
+
+        if tr_cd == 'CIDBT01000':
+            block = data['CIDBT01000InBlock1']
+            order = account.orders.get(block['OvrsFutsOrgOrdNo'])
+            if order is None or order.filled or order.cancelled:
+                return {'rsp_cd': '02714', 'rsp_msg': '취소할 수 있는 주문이 없습니다.'}
+            order.cancelled = True
+            return {
+                'rsp_cd': '00040',
+                'rsp_msg': '취소주문이 완료되었습니다.',
+                'CIDBT01000OutBlock2': {'AcntNo': account.account_no, 'OvrsFutsOrdNo': f"{next(self.order_numbers):010d}"},
+            }
+
+        return {'rsp_cd': '99999', 'rsp_msg': f'지원하지 않는 TR입니다: {tr_cd}'}
+
+
+class SimulatedOpenApi:
+    """
+    ebest.OpenApi와 같은 인터페이스 (login, close, request, connected, last_message)
+    """
+    def __init__(self, exchange: SimulatedExchange):
+        self.exchange = exchange
+        self._access_token = ""
+        self._connected: bool = False
+        self._is_simulation: bool = True
+        self._last_message: str = ""
+        self._app_key: str = ""
+        self._token_expire_at: float = math.inf
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @property
+    def is_simulation(self) -> bool:
+        return self._is_simulation
+
+    @property
+    def last_message(self) -> str:
+        return self._last_message
+
+    async def close(self) -> None:
+        self._connected = False
+
+    async def login(self, appkey: str, appsecretkey: str) -> bool:
+        if self._connected:
+            self._last_message = "aleady connected"
+            return True
+        if appkey == "" or appsecretkey == "":
+            self._last_message = "appkey or appsecretkey is empty"
+            return False
+        await self.sleep_latency("login")
+        self._app_key = appkey
+        self._access_token = f"sim-{appkey}-{time.monotonic_ns()}"
+        ttl = self.exchange.token_ttl
+        self._token_expire_at = time.monotonic() + ttl if ttl else math.inf
+        self._connected = True
+        self.exchange.get_account(appkey)
+        return True
+
+    async def sleep_latency(self, tr_cd: str) -> None:
+        profile = self.exchange.latencies.get(tr_cd)
+        if profile is not None:
+            delay = profile.sample(self.exchange.rng)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def request(self, tr_cd: str, data: dict | str, **kwargs) -> ResponseValue | None:
+        self._last_message = ""
+        if not self._connected:
+            self._last_message = "Not connected"
+            return None
+        if isinstance(data, str):
+            data = json.loads(data)
+
+        self.exchange.request_counts[tr_cd] = self.exchange.request_counts.get(tr_cd, 0) + 1
+        request_time = time.time()
+        start_time = time.perf_counter_ns()
+        await self.sleep_latency(tr_cd)
+
+        if time.monotonic() >= self._token_expire_at:
+            self._last_message = ERROR_RESPONSES[ErrorMsg.EXPIRED_TOKEN]
+            return None
+
+        # 토큰, 지연 에러는 HTTP 에러 (None 반환), 잔고 부족은 정상 응답에 에러 메세지
+        error = self.exchange.pick_error(tr_cd)
+        if error in (ErrorMsg.EXPIRED_TOKEN, ErrorMsg.INVALID_TOKEN, ErrorMsg.SERVICE_DELAY):
+            self._last_message = ERROR_RESPONSES[error]
+            return None
+        if error is not None:
+            body = ERROR_RESPONSES[error]
+        else:
+            body = self.exchange.handle(self._app_key, tr_cd, data)
+
+        result = ResponseValue('/simulator', tr_cd, 'N', '', json.dumps(body, ensure_ascii=False))
+        result.request_text = json.dumps(data, ensure_ascii=False)
+        result.request_time = request_time
+        result.elapsed_ms = (time.perf_counter_ns() - start_time) / 1000000
+        return result
+
+
+def install(exchange_manager, exchange: SimulatedExchange | None = None) -> SimulatedExchange:
+    """
+    exchange_manager의 모든 계좌 API를 SimulatedOpenApi로 교체 (재로그인 시 새로 만드는 API도 포함)
+    returns: 사용한 SimulatedExchange
+    """
+    if exchange is None:
+        exchange = SimulatedExchange()
+    exchange_manager.accounts.api_factory = lambda: SimulatedOpenApi(exchange)
+    for account in exchange_manager.accounts.accounts:
+        account.api = SimulatedOpenApi(exchange)
+        account.connected = False
+    return exchange
+
+
+# singleton (USE_SIMULATOR 설정 시 AccountRegistry가 사용)
+simulatedExchange = SimulatedExchange()
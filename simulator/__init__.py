@@ -0,0 +1,2 @@
+from .FakeFillServer import FakeFillServer
+from .SimulatedOpenApi import LatencyProfile, SimulatedExchange, SimulatedOpenApi, install, simulatedExchange
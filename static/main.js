@@ -26,6 +26,61 @@ async function sendRequest(url, method = "GET", body = null) {
     }
 }
 
+// Live status (Server-Sent Events)
+const liveStateElement = document.getElementById("live-state");
+const liveStatusElement = document.getElementById("live-status");
+const liveOrdersElement = document.getElementById("live-orders");
+const MAX_ORDER_LINES = 50;
+let eventSource = null;
+
+async function subscribeEvents() {
+    unsubscribeEvents();
+    const password = document.getElementById("password").value.trim();
+    liveStateElement.textContent = "Connecting...";
+    // password는 body로 보내고 /events에는 서버가 발급한 쿠키로 접속 (URL에 password를 남기지 않음)
+    try {
+        const response = await fetch("/events/token", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ password }),
+        });
+        if (!response.ok) {
+            throw new Error(`${response.status} ${response.statusText}`);
+        }
+    } catch (error) {
+        liveStateElement.textContent = `Not connected (${error.message})`;
+        return;
+    }
+    eventSource = new EventSource("/events");
+
+    eventSource.onopen = () => {
+        liveStateElement.textContent = "Connected";
+    };
+    eventSource.onerror = () => {
+        // EventSource가 자동으로 재연결
+        liveStateElement.textContent = "Disconnected (retrying...)";
+    };
+    eventSource.addEventListener("status", (event) => {
+        liveStatusElement.textContent = JSON.stringify(JSON.parse(event.data), null, 2);
+    });
+    eventSource.addEventListener("order", (event) => {
+        const order = JSON.parse(event.data);
+        const line = `${new Date().toLocaleTimeString()} [${order.account}] ${order.code} ${order.direction} ${order.qty} - ${order.result}` +
+            (order.order_no ? ` (#${order.order_no}, ${order.submit_ms} ms)` : "");
+        liveOrdersElement.textContent = [line, ...liveOrdersElement.textContent.split("\n").filter(Boolean)]
+            .slice(0, MAX_ORDER_LINES)
+            .join("\n");
+    });
+}
+
+function unsubscribeEvents() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+        liveStateElement.textContent = "Not connected";
+    }
+}
+
 // Event handlers for each section
 document.body.addEventListener("click", (event) => {
     const action = event.target.dataset.action;
@@ -48,12 +103,16 @@ document.body.addEventListener("click", (event) => {
             url = "/log_level";
             break;
         case "apply-betting-params":
-            const slave1Multiple = parseInt(document.getElementById("betting-slave1-multiple").value);
-            const slave2Multiple = parseInt(document.getElementById("betting-slave2-multiple").value);
+            let slaveMultiples;
+            try {
+                slaveMultiples = JSON.parse(document.getElementById("betting-slave-multiples").value || "{}");
+            } catch (error) {
+                alert("Slave Multiples must be JSON. ex) {\"SLAVE1\": 1}");
+                return;
+            }
             body = {
                 betting_params: {
-                    slave1_multiple: slave1Multiple,
-                    slave2_multiple: slave2Multiple
+                    slave_multiples: slaveMultiples
                 }
             };
             url = "/set_betting_params";
@@ -62,10 +121,12 @@ document.body.addEventListener("click", (event) => {
             body = { password: document.getElementById("password").value.trim() };
             url = "/view_params";
             break;
-        case "view-status":
-            body = { password: document.getElementById("password").value.trim() };
-            url = "/view_status";
-            break;
+        case "subscribe-events":
+            subscribeEvents();
+            return;
+        case "unsubscribe-events":
+            unsubscribeEvents();
+            return;
 
         ////////////////////////////  admin.html  ////////////////////////////
         case "on-whitelist":
@@ -11,7 +11,8 @@ from utility.common import print
 
 # Master API 로그인
 await exchangeManager.initialize()  # type: ignore
-api: ebest.OpenApi = exchangeManager.master # 테스트용 API 객체
+account = exchangeManager.master # 테스트용 계좌
+api: ebest.OpenApi = account.api # 테스트용 API 객체
 
 # ------------- 해외선물 미결제잔고내역 조회 -------------
 inputs = {
@@ -55,14 +56,13 @@ OrdQty = 2  # 주문수량
 
 
 result = await exchangeManager.request_new_order(
-    api=api,
+    account=account,
     IsuCodeVal=IsuCodeVal,
     _BnsTpCode=bnsTpCode,
     _AbrdFutsOrdPtnCode=abrdFutsOrdPtnCode,
     OvrsDrvtOrdPrc=0,  # 시장가이므로 0
     CndiOrdPrc=0,
     OrdQty=OrdQty,
-    type=APIType.MASTER,
 )
 
 
@@ -1,18 +1,23 @@
-import sys, traceback, asyncio, functools, os
+import sys, traceback, asyncio, functools, itertools, os, orjson
 from datetime import datetime, timedelta, timezone
 from dhooks import Webhook, Embed
 from loguru import logger
 from typing import Literal
+from utility.NotificationQueue import NotificationQueue, RateLimited, get_retry_after
+from utility.FileLogQueue import FileLogQueue
 
 LOGGER_LEVEL_LITERAL = Literal["TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"]
 LOGGER_LEVELS = ("TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
+LOGGER_LEVEL_NO = {level: logger.level(level).no for level in LOGGER_LEVELS}  # loguru 레벨 번호 (TRACE: 5 ~ CRITICAL: 50)
+TRACE_NO, DEBUG_NO, INFO_NO, SUCCESS_NO, WARNING_NO, ERROR_NO, CRITICAL_NO = LOGGER_LEVEL_NO.values()
 
 def log_level_under(level: LOGGER_LEVEL_LITERAL):
+    level_no = LOGGER_LEVEL_NO[level]  # 호출할 때마다 찾지 않도록 데코레이터 적용 시점에 계산
     def decorator(func):
         if asyncio.iscoroutinefunction(func):
             @functools.wraps(func)
             async def async_wrapper(self, *args, **kwargs):
-                if LOGGER_LEVELS.index(self.log_level) <= LOGGER_LEVELS.index(level):
+                if self.log_level_no <= level_no:
                     return await func(self, *args, **kwargs)
                 else:
                     return None
@@ -20,42 +25,57 @@ def log_level_under(level: LOGGER_LEVEL_LITERAL):
         else:
             @functools.wraps(func)
             def sync_wrapper(self, *args, **kwargs):
-                if LOGGER_LEVELS.index(self.log_level) <= LOGGER_LEVELS.index(level):
+                if self.log_level_no <= level_no:
                     return func(self, *args, **kwargs)
                 else:
                     return None
             return sync_wrapper
     return decorator
 
+def format_json(record) -> str:
+    """
+    JSON lines 파일 포맷 (한 줄에 로그 하나, tick: 같은 on_timer_update 안에서 찍힌 로그끼리 같은 값)
+    """
+    record["extra"]["json"] = orjson.dumps({
+        "time": record["time"].isoformat(timespec="milliseconds"),
+        "level": record["level"].name,
+        "pid": record["process"].id,
+        "tick": record["extra"].get("tick"),
+        "message": record["message"],
+    }).decode()
+    return "{extra[json]}\n"
+
 class BaseLogManager:
-    def __init__(self, discord_webhook_url: str | None = None):
+    def __init__(self, discord_webhook_url: str | None = None, json_logs: bool = False):
         self.discord_webhook_url = discord_webhook_url
         self.log_level: LOGGER_LEVEL_LITERAL = "DEBUG"
+        self.log_level_no: int = LOGGER_LEVEL_NO[self.log_level]  # 콘솔 레벨
+        self.file_level_no: int = LOGGER_LEVEL_NO["INFO"]        # 파일 레벨
+        self.min_level_no: int = min(self.log_level_no, self.file_level_no)  # 이보다 낮은 로그는 loguru 호출 없이 버림
+        self.tick_ids = itertools.count(1)
 
         current_dir = os.path.dirname(os.path.abspath(__file__))
         project_root = os.path.dirname(current_dir) 
-        log_path = os.path.join(project_root, "log", "lscopybot.log")
+        log_path = os.path.join(project_root, "log", "lscopybot.jsonl" if json_logs else "lscopybot.log")
         os.makedirs(os.path.dirname(log_path), exist_ok=True)
         
         # Logger 설정
         logger.remove(0)
-        logger.add(
-            log_path,
-            rotation="1 days",
-            retention="7 days",
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
-            level="INFO"
-        )
+        logger.configure(extra={"tick": None})
+        self.file_handler_id = self.add_file_sink(log_path, json_logs)
+        # 콘솔 레벨은 filter에서 비교 -> 레벨 변경 시 핸들러를 다시 만들지 않음
         self.console_handler_id = logger.add(
             sys.stderr,
             colorize=True,
             format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <level>{message}</level>",
-            level=self.log_level
+            filter=self.console_filter,
+            level="TRACE"
         )
         self.logger = logger
 
         # Discord Webhook 설정
         self.hook_async = None
+        self.notification_queue: NotificationQueue | None = None
         try:
             url = discord_webhook_url.replace("discordapp", "discord")
             self.hook = Webhook(url)
@@ -75,19 +95,48 @@ class BaseLogManager:
             logger.error("웹훅 URL이 유효하지 않습니다: {}", self.discord_webhook_url)
             self.hook_async = None
 
+        # 웹훅 전송 대기열 (event loop 안에서 호출된 경우)
+        if self.hook_async:
+            try:
+                self.notification_queue = NotificationQueue(self.send_webhook_async)
+                self.notification_queue.start()
+            except RuntimeError:
+                self.notification_queue = None
+
+    async def close(self):
+        # 남은 웹훅 메세지 전송
+        if self.notification_queue:
+            await self.notification_queue.close()
+            self.notification_queue = None
+        # 파일 대기열에 남은 로그 기록
+        await logger.complete()
+
+    def add_file_sink(self, path: str, json_logs: bool = False, queued: bool = True) -> int:
+        """
+        파일 로그 핸들러 추가 (매일 새 파일, 7일 보관)
+        queued: 파일 쓰기는 백그라운드 thread에서 (event loop는 대기열에 넣기만 함)
+        returns: handler id
+        """
+        log_format = format_json if json_logs else "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+        if queued:
+            return logger.add(FileLogQueue(path, retention_days=7), format=log_format, level=self.file_level_no)
+        return logger.add(path, rotation="1 days", retention="7 days", format=log_format, level=self.file_level_no)
+
+    def console_filter(self, record) -> bool:
+        return record["level"].no >= self.log_level_no
+
     def set_console_log_level(self, level: LOGGER_LEVEL_LITERAL):
         if level not in LOGGER_LEVELS:
             raise ValueError(f"로그 레벨은 {LOGGER_LEVELS} 중 하나여야 합니다.")
-        # 기존 콘솔 핸들러 제거
-        logger.remove(self.console_handler_id)
-        # 새로운 콘솔 핸들러 추가 (레벨 변경)
-        self.console_handler_id = logger.add(
-            sys.stderr,
-            colorize=True,
-            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <level>{message}</level>",
-            level=level,
-        )
         self.log_level = level
+        self.log_level_no = LOGGER_LEVEL_NO[level]
+        self.min_level_no = min(self.log_level_no, self.file_level_no)
+
+    def tick_context(self):
+        """
+        with logManager.tick_context(): 안에서 찍힌 로그 (하위 task 포함)에 같은 tick id
+        """
+        return logger.contextualize(tick=next(self.tick_ids))
 
     def set_test_mode(self, test_mode: bool):
         self.test_mode = test_mode
@@ -112,8 +161,41 @@ class BaseLogManager:
     ################################
     # discord webhook
     ################################
+    async def send_webhook_async(self, content: str, embeds: list[Embed]) -> float:
+        """
+        웹훅 한번 전송 (NotificationQueue)
+        dhooks는 429의 retry_after (초)를 ms로 계산해서 바로 다시 보내므로 직접 요청
+        429면 RateLimited, 남은 요청 수가 0이면 reset까지 기다릴 시간 반환
+        """
+        payload = {"embeds": [embed.to_dict() for embed in embeds]}
+        if content:
+            payload["content"] = content
+        async with self.hook_async.session.post(self.hook_async.url, json=payload) as response:
+            if response.status == 429:
+                raise RateLimited(get_retry_after(response.headers))
+            response.raise_for_status()
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                return get_retry_after(response.headers, 0.0)
+            return 0.0
+
+    def enqueue_message(self, message: str, embed: Embed = None) -> bool:
+        """
+        웹훅 대기열에 넣기 (embed가 있으면 embed만 전송)
+        returns: 대기열을 사용하지 못하면 False
+        """
+        if not (self.notification_queue and self.notification_queue.running):
+            return False
+        try:
+            self.notification_queue.put(None if embed else message, embed)
+        except RuntimeError:
+            # event loop 종료됨
+            return False
+        return True
+
     def log_message(self, message: str="None", embed: Embed = None):
         try:
+            if self.enqueue_message(message, embed):
+                return
             if self.hook:
                 if embed:
                     self.hook.send(embed=embed)
@@ -165,6 +247,8 @@ class BaseLogManager:
     ################################
     async def log_message_async(self, message: str="None", embed: Embed = None):
         try:
+            if self.enqueue_message(message, embed):
+                return
             if self.hook_async:
                 if embed:
                     await self.hook_async.send(embed=embed)
@@ -215,30 +299,30 @@ class BaseLogManager:
     # logger wrapper
     ################################
     def trace(self, message: str, for_test_mode: bool = False):
-        if not self.test_mode or for_test_mode:
+        if self.min_level_no <= TRACE_NO and (not self.test_mode or for_test_mode):
             logger.trace(message)
 
     def debug(self, message: str, for_test_mode: bool = False):
-        if not self.test_mode or for_test_mode:
+        if self.min_level_no <= DEBUG_NO and (not self.test_mode or for_test_mode):
             logger.debug(message)
 
     def info(self, message: str, for_test_mode: bool = False):
-        if not self.test_mode or for_test_mode:
+        if self.min_level_no <= INFO_NO and (not self.test_mode or for_test_mode):
             logger.info(message)
 
     def success(self, message: str, for_test_mode: bool = False):
-        if not self.test_mode or for_test_mode:
+        if self.min_level_no <= SUCCESS_NO and (not self.test_mode or for_test_mode):
             logger.success(message)
     
     def warning(self, message: str, for_test_mode: bool = False):
-        if not self.test_mode or for_test_mode:
+        if self.min_level_no <= WARNING_NO and (not self.test_mode or for_test_mode):
             logger.warning(message)
     
     def error(self, message: str, for_test_mode: bool = False):
-        if not self.test_mode or for_test_mode:
+        if self.min_level_no <= ERROR_NO and (not self.test_mode or for_test_mode):
             logger.error(message)
 
     def critical(self, message: str, for_test_mode: bool = False):
-        if not self.test_mode or for_test_mode:
+        if self.min_level_no <= CRITICAL_NO and (not self.test_mode or for_test_mode):
             logger.critical(message)
 
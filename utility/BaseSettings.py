@@ -33,7 +33,7 @@ class BaseSettings:
             return self._str_to_bool(value)
         elif target_type in {str, str|None}:
             return value
-        elif target_type in {list, list[str], list[str]|None}:
+        elif target_type in {list, list[str], list[str]|None, list[dict], list[dict]|None}:
             return json.loads(value)
         elif target_type is None or target_type == type(None):
             return None
@@ -0,0 +1,111 @@
+from datetime import date, timedelta
+import asyncio, glob, os, queue, threading, time
+
+
+class FileLogQueue:
+    """
+    loguru 파일 sink (logger.add(FileLogQueue(path), ...))
+    - write는 포맷된 로그를 thread 대기열에 넣기만 하고 바로 반환 (event loop를 막지 않음)
+    - 백그라운드 thread가 flush_interval 마다 대기열에 쌓인 로그를 한번에 기록
+      (로그마다 thread를 깨우면 GIL 경합으로 event loop가 늦어짐)
+    - 날짜별 파일 (<이름>.<날짜><확장자>)에 O_APPEND로 기록, retention_days 지난 파일은 삭제
+      uvicorn worker, shard 프로세스가 같은 파일에 써도 파일 이름을 바꾸지 않으므로 서로 덮어쓰지 않음
+      (한 번에 모은 로그는 write 한번 -> 다른 프로세스의 로그와 줄 중간에서 섞이지 않음)
+    loguru의 enqueue=True는 로그마다 pickle + multiprocessing pipe를 거쳐서 동기 쓰기보다 느림
+    """
+    def __init__(self, path: str, retention_days: int = 7, flush_interval: float = 0.05):
+        self.path = path
+        self.retention_days = retention_days
+        self.flush_interval = flush_interval
+        self.stem, self.ext = os.path.splitext(path)
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.fd: int | None = None
+        self.opened_on: date | None = None
+        self.thread = threading.Thread(target=self.run, name="log-file-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, message: str) -> None:
+        self.queue.put(message)
+
+    def run(self) -> None:
+        while True:
+            item = self.queue.get()
+            lines: list[str] = []
+            done: list[threading.Event] = []
+            stop = False
+            while True:
+                if item is None:
+                    stop = True
+                    break
+                if isinstance(item, threading.Event):
+                    done.append(item)
+                else:
+                    lines.append(item)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if lines:
+                self.write_lines(lines)
+            for event in done:
+                event.set()
+            if stop:
+                self.close_file()
+                return
+            time.sleep(self.flush_interval)
+
+    def write_lines(self, lines: list[str]) -> None:
+        try:
+            if self.opened_on != date.today():
+                self.rotate()
+            data = "".join(lines).encode("utf-8")
+            while data:
+                written = os.write(self.fd, data)
+                data = data[written:]
+        except OSError:
+            self.close_file()  # 디스크 에러로 로그 thread가 죽지 않도록 (다음 로그에서 다시 열기)
+
+    def get_path(self, day: date) -> str:
+        return f"{self.stem}.{day:%Y-%m-%d}{self.ext}"
+
+    def rotate(self) -> None:
+        """
+        오늘 파일 열기, 보관 기간이 지난 파일 삭제 (다른 프로세스가 먼저 지웠으면 무시)
+        """
+        self.close_file()
+        today = date.today()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.fd = os.open(self.get_path(today), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.opened_on = today
+
+        expired = self.get_path(today - timedelta(days=self.retention_days))
+        for old_path in glob.glob(f"{glob.escape(self.stem)}.????-??-??{self.ext}"):
+            if old_path < expired:
+                try:
+                    os.remove(old_path)
+                except FileNotFoundError:
+                    pass
+
+    def close_file(self) -> None:
+        if self.fd is not None:
+            try:
+                os.close(self.fd)
+            except OSError:
+                pass
+            self.fd = None
+            self.opened_on = None
+
+    async def complete(self) -> None:
+        """
+        지금까지 넣은 로그가 파일에 기록될 때까지 대기 (await logger.complete()에서 호출)
+        """
+        done = threading.Event()
+        self.queue.put(done)
+        await asyncio.to_thread(done.wait, 5.0)
+
+    def stop(self) -> None:
+        """
+        남은 로그를 기록하고 thread 종료 (logger.remove에서 호출)
+        """
+        self.queue.put(None)
+        self.thread.join(5.0)
@@ -0,0 +1,164 @@
+from collections import deque
+from dhooks import Embed
+from loguru import logger
+from typing import Awaitable, Callable
+import asyncio
+
+DISCORD_MAX_EMBEDS = 10      # 웹훅 한번에 보낼 수 있는 embed 수
+DISCORD_MAX_CONTENT = 2000   # 웹훅 content 최대 길이
+
+
+class RateLimited(Exception):
+    """
+    웹훅 429 응답 (retry_after: 다시 보내기 전에 기다릴 시간, 초)
+    """
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def get_retry_after(headers, default: float = 1.0) -> float:
+    """
+    Retry-After (초), 없으면 X-RateLimit-Reset-After
+    """
+    for name in ("Retry-After", "X-RateLimit-Reset-After"):
+        try:
+            return max(float(headers[name]), 0.0)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return default
+
+
+class NotificationQueue:
+    """
+    Discord 웹훅 전송 대기열
+    - put은 대기열에 넣기만 하고 바로 반환 (트레이딩 루프를 막지 않음)
+    - 백그라운드 worker가 coalesce_window 동안 모인 메세지를 웹훅 한번으로 묶어서 전송
+    - 전송 사이에 interval 만큼 쉬어서 Discord rate limit (2초에 5회) 아래로 유지
+    - 429 (RateLimited)면 batch를 버리지 않고 Retry-After 동안 기다린 뒤 다시 전송
+      send가 대기 시간을 반환하면 (남은 요청 수 0) 다음 전송도 그만큼 늦춤
+    - 대기열이 가득 차면 새 메세지는 버리고, 버린 개수를 다음 전송에 요약해서 표시
+    """
+    def __init__(self,
+                 send: Callable[[str, list[Embed]], Awaitable[float | None]],
+                 max_size: int = 200,
+                 interval: float = 0.5,
+                 coalesce_window: float = 0.5):
+        self.send = send
+        self.max_size = max_size
+        self.interval = interval
+        self.coalesce_window = coalesce_window
+        self.items: deque[tuple[str | None, Embed | None]] = deque()
+        self.dropped = 0
+        self.held: tuple[str, list[Embed]] | None = None  # 429로 보내지 못한 batch (다음에 먼저 전송)
+        self.rate_limited = 0
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.event: asyncio.Event | None = None
+        self.task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+        self.task = self.loop.create_task(self.run())
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def put(self, message: str | None = None, embed: Embed | None = None) -> bool:
+        """
+        returns: False이면 대기열이 가득 차서 버려짐
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is not self.loop:
+            # 다른 스레드에서 호출
+            self.loop.call_soon_threadsafe(self.put, message, embed)
+            return True
+
+        if len(self.items) >= self.max_size:
+            self.dropped += 1
+            return False
+        self.items.append((message, embed))
+        self.event.set()
+        return True
+
+    def take_batch(self) -> tuple[str, list[Embed]]:
+        """
+        대기열 앞에서부터 웹훅 한번에 들어가는 만큼 꺼냄
+        """
+        lines: list[str] = []
+        embeds: list[Embed] = []
+        length = 0
+        while self.items:
+            message, embed = self.items[0]
+            if embed is not None and len(embeds) >= DISCORD_MAX_EMBEDS:
+                break
+            if message and lines and length + len(message) + 1 > DISCORD_MAX_CONTENT:
+                break
+            self.items.popleft()
+            if embed is not None:
+                embeds.append(embed)
+            if message:
+                lines.append(message[:DISCORD_MAX_CONTENT])
+                length += len(message) + 1
+
+        if self.dropped:
+            lines.append(f"(대기열이 가득 차서 메세지 {self.dropped}개를 버렸습니다)")
+            self.dropped = 0
+        return "\n".join(lines)[:DISCORD_MAX_CONTENT], embeds
+
+    async def run(self) -> None:
+        while True:
+            if not self.items and self.held is None:
+                self.event.clear()
+                await self.event.wait()
+            await asyncio.sleep(self.coalesce_window)
+            wait = await self.send_batch()
+            await asyncio.sleep(max(self.interval, wait))
+
+    async def send_batch(self) -> float:
+        """
+        returns: 다음 전송 전에 기다릴 시간 (초, rate limit)
+        """
+        if self.held is not None:
+            content, embeds = self.held
+            self.held = None
+        else:
+            content, embeds = self.take_batch()
+        if not content and not embeds:
+            return 0.0
+        try:
+            return await self.send(content, embeds) or 0.0
+        except RateLimited as e:
+            self.held = (content, embeds)
+            self.rate_limited += 1
+            logger.warning(f"웹훅 rate limit, {e.retry_after:.2f}초 후 다시 전송합니다")
+            return e.retry_after
+        except Exception as e:
+            logger.error(f"웹훅 전송 중 에러가 발생했습니다: {e}")
+        return 0.0
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """
+        남은 메세지를 timeout 안에서 최대한 보내고 worker 종료
+        """
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+        async def flush():
+            while self.items or self.dropped or self.held:
+                wait = await self.send_batch()
+                if self.items or self.held:
+                    await asyncio.sleep(max(self.interval, wait))
+        try:
+            await asyncio.wait_for(flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"웹훅 대기열 메세지 {len(self.items) + bool(self.held)}개를 보내지 못했습니다")
@@ -1,4 +1,6 @@
 from utility.BaseLogManager import BaseLogManager, LOGGER_LEVEL_LITERAL, LOGGER_LEVELS
 from utility.BaseSettings import BaseSettings
+from utility.NotificationQueue import NotificationQueue
+from utility.FileLogQueue import FileLogQueue
 from utility.Timer import timer
 from .common import *
\ No newline at end of file
@@ -1,8 +1,14 @@
 from builtins import print as original_print, input as original_input
-from pandas import DataFrame
-from prettytable import PrettyTable
+import sys
 
-from ebest import ResponseValue
+# pandas, prettytable, ebest.ResponseValue는 디버그 출력용이라 처음 사용할 때 import (시작 시간 단축)
+def is_response_value(data) -> bool:
+    ebest = sys.modules.get("ebest")  # ebest를 import하지 않았으면 ResponseValue일 수 없음
+    return ebest is not None and isinstance(data, ebest.ResponseValue)
+
+def is_dataframe(data) -> bool:
+    pandas = sys.modules.get("pandas")  # pandas를 import하지 않았으면 DataFrame일 수 없음
+    return pandas is not None and isinstance(data, pandas.DataFrame)
 
 ext_print = None
 ext_input = None
@@ -19,6 +25,7 @@ async def ainput(prompt: str = "") -> str:
 
 def format_data_to_str(data):
     """데이터를 예쁜 표 모양의 문자열로 반환"""
+    from prettytable import PrettyTable
     if data is None:
         return ""
     
@@ -49,7 +56,7 @@ def format_data_to_str(data):
         result.append(f'Row Count = {len(data)}')
         result.append(table.get_string())
         
-    elif isinstance(data, ResponseValue):
+    elif is_response_value(data):
         result.append(f'tr_cont=\'{data.tr_cont}\', tr_cont_key=\'{data.tr_cont_key}\'')
         for key in data.body.keys():
             result.append(key)
@@ -62,13 +69,13 @@ def format_data_to_str(data):
 
 def format_data_to_dict(data):
     """ResponseValue나 DataFrame 같은 객체를 순수 dict/list 구조로 변환"""
-    if isinstance(data, ResponseValue):
+    if is_response_value(data):
         return {
             "tr_cont": data.tr_cont,
             "tr_cont_key": data.tr_cont_key,
             "body": {k: format_data_to_dict(v) for k, v in data.body.items()}
         }
-    elif isinstance(data, DataFrame):
+    elif is_dataframe(data):
         return data.to_dict(orient='records') # 리스트 형태의 딕셔너리로 변환
     elif isinstance(data, list):
         return [format_data_to_dict(item) for item in data]
@@ -91,6 +98,7 @@ def print(data, *values):
 
 # prettytable을 사용하여 데이터를 표로 이쁘게 출력하는 함수
 def print_table(data):
+    from prettytable import PrettyTable
     if data is None: return
     if isinstance(data, dict):
         table = PrettyTable(['key','value'])
@@ -113,7 +121,7 @@ def print_table(data):
                 pass
             print(f'Row Count = {len(data)}')
             print(table)
-    elif isinstance(data, DataFrame):
+    elif is_dataframe(data):
         table = PrettyTable()
         table.field_names = data.columns
         table.add_rows(data.values)
@@ -123,6 +131,7 @@ def print_table(data):
 
 # 데이터를 csv로 저장하는 함수
 def TOHLCV_to_csv(file_path, data):
+    from pandas import DataFrame
     # 데이터프레임 생성
     df = DataFrame(data)
     # 컬럼명 변경
@@ -133,6 +142,7 @@ def TOHLCV_to_csv(file_path, data):
 
 # csv 파일을 데이터프레임으로 변환하는 함수
 def csv_to_TOHLCV(file_path):
+    from pandas import DataFrame
     # 파일 읽기
     df = DataFrame.from_csv(file_path, encoding='utf-8-sig')
     # 데이터프레임을 리스트로 변환